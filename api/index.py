@@ -1,11 +1,20 @@
-from flask import Flask
+import os
+import sys
 from vercel_wsgi import handle_request
 
-app = Flask(__name__)
+# Only /tmp is writable in the function; set before app (and its caches) is imported
+os.environ.setdefault('CACHE_DB_PATH', '/tmp/research_papers.db')
+os.environ.setdefault('JOBS_DB_PATH', '/tmp/research_papers.db')
+# No /dev/shm for a process pool's semaphores either, so PDFs are parsed in-process
+os.environ.setdefault('PDF_WORKERS', '0')
 
-@app.route("/")
-def home():
-    return "PaperShare running on Vercel"
+# The function is deployed from api/, the app lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+# Background threads freeze between invocations, so /jobs answers 503 here
+app = create_app(jobs=False)
 
 def handler(request):
-    return handle_request(app, request)
\ No newline at end of file
+    return handle_request(app, request)
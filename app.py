@@ -1,109 +1,230 @@
 import os
 import re
-import io
 import json
+import math
+import time
 import logging
-import requests
-from flask import Flask, request, render_template, jsonify
-from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
-from google import genai
-from google.genai import types
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Blueprint, Flask, Response, request, render_template, jsonify, stream_with_context, url_for
+from cache import VALIDATOR_MAX_ENTRIES, VALIDATOR_TTL, ResultCache, parse_arxiv_url, canonical_abs_url, canonical_pdf_url, prompt_hash
+from fetcher import FetchError, conditional_get, executor as fetch_executor
+from pdf_extract import PdfExtractionError, extract_text_from_response, warm_up_pool
+from arxiv_api import chunked, fetch_metadata
+from sse import sse_event, partial_json_fields
+from limits import Abandoned, RateLimited, SingleFlight, gemini_limiter
+from jobs import JobError, JobQueue, RetryLater
+from context import CONTEXT_TOKEN_BUDGET, select_context
 
-app = Flask(__name__)
+# Routes live on a blueprint; create_app() builds the Flask app for every entry point
+bp = Blueprint('papershare', __name__)
 
 # --- Configuration ---
-GEMINI_API_KEY = "ENTER YOUR OWN KEY< NOT MINE MATE"
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', "ENTER YOUR OWN KEY< NOT MINE MATE")
 MODEL_ID = "gemini-3-flash-preview"
+# Optional override of the Gemini API endpoint (used by the offline benchmarks)
+GEMINI_BASE_URL = os.environ.get('GEMINI_BASE_URL')
+# Seconds before a Gemini call is abandoned, so no request (or its waiters) hangs on it
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 60))
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- Initialize the New Client ---
-client = genai.Client(api_key=GEMINI_API_KEY)
+# google-genai is slow to import, so the client is built on first use (or by warm_up)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google import genai
+            from google.genai import types
+            _client = genai.Client(
+                api_key=GEMINI_API_KEY,
+                http_options=types.HttpOptions(base_url=GEMINI_BASE_URL, timeout=int(GEMINI_TIMEOUT * 1000))
+            )
+        return _client
+
+# --- Result Cache ---
+cache = ResultCache()
+# ETag/Last-Modified validators get their own table and a longer TTL than the results above
+validators = ResultCache(ttl=VALIDATOR_TTL, max_entries=VALIDATOR_MAX_ENTRIES, table='http_validators')
+
+BUSY_MESSAGE = 'PaperShare is busy right now. Please try again in a few seconds.'
+
+# --- Batch Worker Pool ---
+BATCH_MAX_URLS = int(os.environ.get('BATCH_MAX_URLS', 200))
+batch_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('BATCH_WORKERS', 8)),
+                                    thread_name_prefix='batch')
+# Per-upstream concurrency limits, shared by all batch workers
+arxiv_slots = threading.BoundedSemaphore(int(os.environ.get('ARXIV_CONCURRENCY', 4)))
+gemini_slots = threading.BoundedSemaphore(int(os.environ.get('GEMINI_CONCURRENCY', 4)))
 
 # --- PDF & ArXiv Crawler ---
+def parse_abs_page(response):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+    title = soup.find('h1', class_='title')
+    abstract = soup.find('blockquote', class_='abstract')
+    # --- NEW: Extract Authors ---
+    authors = soup.find('div', class_='authors')
+    if not (title and abstract and authors):
+        raise ValueError(f"Unexpected abs page layout at {response.url}")
+    return {
+        'title': title.text.replace('Title:', '').strip(),
+        'authors': authors.text.replace('Authors:', '').strip(),
+        'abstract': abstract.text.replace('Abstract:', '').strip(),
+    }
+
 def extract_pdf_text(pdf_url):
     try:
-        response = requests.get(pdf_url, timeout=15)
-        reader = PdfReader(io.BytesIO(response.content))
-        text = ""
-        for i in range(min(3, len(reader.pages))):
-            text += reader.pages[i].extract_text()
-        return text[:10000]
-    except Exception as e:
+        return conditional_get(pdf_url, extract_text_from_response, validators, stream=True)
+    except (FetchError, PdfExtractionError) as e:
         logger.warning(f"PDF Error: {e}")
         return ""
 
 def crawl_arxiv(url):
+    arxiv_id, version = parse_arxiv_url(url)
+    abs_url = canonical_abs_url(arxiv_id, version)
+    # The PDF URL is derivable from the ID, so both downloads run in parallel
+    pdf_future = fetch_executor.submit(extract_pdf_text, canonical_pdf_url(arxiv_id, version))
     try:
-        response = requests.get(url, timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.find('h1', class_='title').text.replace('Title:', '').strip()
-        abstract = soup.find('blockquote', class_='abstract').text.replace('Abstract:', '').strip()
-        
-        # --- NEW: Extract Authors ---
-        authors = soup.find('div', class_='authors').text.replace('Authors:', '').strip()
-        
-        pdf_url = url.replace('/abs/', '/pdf/') + ".pdf"
-        pdf_text = extract_pdf_text(pdf_url)
-        
-        return {
-            'title': title, 
-            'authors': authors, 
-            'abstract': abstract, 
-            'url': url, 
-            'pdf_text': pdf_text
-        }
-    except Exception as e:
+        meta = conditional_get(abs_url, parse_abs_page, validators)
+    except (FetchError, ValueError) as e:
         logger.error(f"Crawl Error: {e}")
+        pdf_future.cancel()
         return None
 
+    return {
+        'title': meta['title'], 
+        'authors': meta['authors'], 
+        'abstract': meta['abstract'], 
+        'url': abs_url, 
+        'pdf_text': pdf_future.result(),
+        'arxiv_id': arxiv_id,
+        'version': version
+    }
+
 # --- AI Analysis ---
-def analyze_paper(paper):
-    # Modified prompt with student-creator persona and researcher attribution
-    prompt = f"""
+# Modified prompt with student-creator persona and researcher attribution
+PROMPT_TEMPLATE = """
     CONTEXT: You are a tech-savvy student and digital content creator. You love translating complex research into engaging content for your peers and followers.
     
-    TASK: Analyze this research paper and create social media content. You MUST mention the researchers/authors ({paper['authors']}) in the posts to give them proper credit.
+    TASK: Analyze this research paper and create social media content. You MUST mention the researchers/authors ({authors}) in the posts to give them proper credit.
 
-    PAPER_TITLE: {paper['title']}
-    AUTHORS: {paper['authors']}
-    ABSTRACT: {paper['abstract']}
-    TECHNICAL_CONTEXT: {paper['pdf_text'][:5000]}
+    PAPER_TITLE: {title}
+    AUTHORS: {authors}
+    ABSTRACT: {abstract}
+    TECHNICAL_CONTEXT: {technical_context}
 
     Return ONLY a JSON object with these exact keys:
     "headline": (Catchy with emoji, student-style),
-    "linkedin_post": (4 paragraphs from a student's perspective: Why I'm reading this, the breakthrough by {paper['authors']}, how it works, and a question for the community),
+    "linkedin_post": (4 paragraphs from a student's perspective: Why I'm reading this, the breakthrough by {authors}, how it works, and a question for the community),
     "twitter_thread": (A punchy 3-tweet summary. Tweet 1 must credit the researchers),
     "novice_analogy": (Explain the tech like an analogy to a household object),
     "key_takeaway": (The most important result in 1 sentence),
     "hashtags": (list of 5)
     """
+# The context budget changes what Gemini sees, so it is part of the analysis cache key
+PROMPT_HASH = prompt_hash(f"{PROMPT_TEMPLATE}|context_budget={CONTEXT_TOKEN_BUDGET}")
+
+def build_prompt(paper):
+    technical_context, stats = select_context(paper['pdf_text'], paper['abstract'])
+    logger.info(
+        f"Context for {paper['arxiv_id']}{paper['version']}: {stats['context_tokens']} tokens "
+        f"({stats['tokens_saved']} saved vs. raw slice, {stats['extracted_tokens']} extracted)"
+    )
+    return PROMPT_TEMPLATE.format(
+        title=paper['title'],
+        authors=paper['authors'],
+        abstract=paper['abstract'],
+        technical_context=technical_context,
+    )
+
+def generation_config():
+    from google.genai import types
 
+    return types.GenerateContentConfig(
+        response_mime_type='application/json',
+        safety_settings=[types.SafetySetting(category='HARM_CATEGORY_DANGEROUS_CONTENT', threshold='BLOCK_NONE')]
+    )
+
+def analyze_paper(paper):
+    gemini_limiter.acquire()
     try:
-        response = client.models.generate_content(
+        response = get_client().models.generate_content(
             model=MODEL_ID,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                safety_settings=[types.SafetySetting(category='HARM_CATEGORY_DANGEROUS_CONTENT', threshold='BLOCK_NONE')]
-            )
+            contents=build_prompt(paper),
+            config=generation_config()
         )
         return json.loads(response.text)
     except Exception as e:
         logger.error(f"AI Call Failed: {e}")
         return None
 
+def analyze_paper_stream(paper):
+    """Yield the raw JSON text chunks as Gemini generates them."""
+    gemini_limiter.acquire()
+    for chunk in get_client().models.generate_content_stream(
+        model=MODEL_ID,
+        contents=build_prompt(paper),
+        config=generation_config()
+    ):
+        if chunk.text:
+            yield chunk.text
+
+# --- Cached Pipeline ---
+# Concurrent requests for the same paper share one in-flight crawl/analysis
+inflight = SingleFlight()
+
+def get_paper(url):
+    arxiv_id, version = parse_arxiv_url(url)
+    key = f"crawl:{arxiv_id}{version}"
+    paper = cache.get(key)
+    if paper is None:
+        paper = inflight.do(key, _crawl_and_cache, key, url)
+    return paper
+
+def _crawl_and_cache(key, url):
+    paper = crawl_arxiv(url)
+    if is_complete(paper):
+        cache.set(key, paper)
+    return paper
+
+def is_complete(paper):
+    """A crawl whose PDF failed is served but not cached, and neither is any analysis of it,
+    so the next request retries the PDF instead of pinning an abstract-only result."""
+    return bool(paper and paper['pdf_text'])
+
+def analysis_key(paper):
+    return f"analysis:{paper['arxiv_id']}{paper['version']}:{MODEL_ID}:{PROMPT_HASH}"
+
+def get_analysis(paper):
+    key = analysis_key(paper)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = inflight.do(key, _analyze_and_cache, key, paper)
+    return analysis
+
+def _analyze_and_cache(key, paper):
+    analysis = analyze_paper(paper)
+    if analysis and is_complete(paper):
+        cache.set(key, analysis)
+    return analysis
+
 # --- Routes ---
 
-@app.route('/', methods=['GET', 'POST'])
+@bp.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         return process_logic()
     return render_template('index.html')
 
-@app.route('/process', methods=['POST'])
+@bp.route('/process', methods=['POST'])
 def process():
     return process_logic()
 
@@ -111,29 +232,317 @@ def process_logic():
     data = request.get_json()
     url = data.get('url', '').strip()
     
-    if not url or 'arxiv.org' not in url:
+    if not url or not parse_arxiv_url(url):
         return jsonify({'success': False, 'error': 'Please provide a valid arXiv URL'})
 
-    paper_data = crawl_arxiv(url)
-    if not paper_data:
-        return jsonify({'success': False, 'error': 'Could not fetch paper details'})
+    timings = {}
+    try:
+        started = time.perf_counter()
+        paper_data = get_paper(url)
+        timings['crawl'] = time.perf_counter() - started
+        if not paper_data:
+            return jsonify({'success': False, 'error': 'Could not fetch paper details'})
 
-    analysis = analyze_paper(paper_data)
-    if not analysis:
-        return jsonify({'success': False, 'error': 'AI Analysis failed.'})
+        started = time.perf_counter()
+        analysis = get_analysis(paper_data)
+        timings['analysis'] = time.perf_counter() - started
+        if not analysis:
+            return jsonify({'success': False, 'error': 'AI Analysis failed.'})
+    except RateLimited as e:
+        return rate_limited(e)
+
+    response = jsonify({'success': True, 'data': format_result(paper_data, analysis, url)})
+    # Per-stage durations for browser devtools and bench/loadtest.py
+    response.headers['Server-Timing'] = ', '.join(
+        f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()
+    )
+    return response
 
+def rate_limited(error):
+    logger.warning(f"Rejected request: {error}")
+    response = jsonify({'success': False, 'error': BUSY_MESSAGE, 'retry_after': math.ceil(error.retry_after)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(error.retry_after))
+    return response
+
+def format_result(paper_data, analysis, url):
     tags = " ".join([f"#{t.replace(' ', '')}" for t in analysis.get('hashtags', [])])
     
-    return jsonify({
-        'success': True,
-        'data': {
-            'paper_title': paper_data['title'],
-            'authors': paper_data['authors'], # Included in raw data
-            'linkedin': f"{analysis['linkedin_post']}\n\n{tags}",
-            'twitter': f"{analysis['twitter_thread']}\n\nRead more: {url}",
-            'novice': f"⭐ THE BIG IDEA:\n{analysis['key_takeaway']}\n\n🏠 ANALOGY:\n{analysis['novice_analogy']}"
-        }
-    })
+    return {
+        'paper_title': paper_data['title'],
+        'authors': paper_data['authors'], # Included in raw data
+        'linkedin': f"{analysis['linkedin_post']}\n\n{tags}",
+        'twitter': f"{analysis['twitter_thread']}\n\nRead more: {url}",
+        'novice': f"⭐ THE BIG IDEA:\n{analysis['key_takeaway']}\n\n🏠 ANALOGY:\n{analysis['novice_analogy']}"
+    }
+
+# --- Streaming (Server-Sent Events) ---
+@bp.route('/process/stream', methods=['POST'])
+def process_stream():
+    data = request.get_json(silent=True) or {}
+    url = data.get('url', '').strip()
+    return Response(stream_with_context(stream_pipeline(url)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def stream_pipeline(url):
+    """Emit stage, paper and field events as work progresses, then the /process payload."""
+    if not url or not parse_arxiv_url(url):
+        yield sse_event('error', {'success': False, 'error': 'Please provide a valid arXiv URL'})
+        return
+
+    yield sse_event('stage', {'stage': 'crawl'})
+    try:
+        paper_data = get_paper(url)
+    except RateLimited as e:
+        yield sse_event('error', {'success': False, 'error': BUSY_MESSAGE, 'retry_after': math.ceil(e.retry_after)})
+        return
+    if not paper_data:
+        yield sse_event('error', {'success': False, 'error': 'Could not fetch paper details'})
+        return
+    yield sse_event('paper', {'paper_title': paper_data['title'], 'authors': paper_data['authors']})
+
+    yield sse_event('stage', {'stage': 'analysis'})
+    try:
+        analysis = yield from stream_analysis(paper_data)
+    except RateLimited as e:
+        yield sse_event('error', {'success': False, 'error': BUSY_MESSAGE, 'retry_after': math.ceil(e.retry_after)})
+        return
+
+    if not analysis:
+        yield sse_event('error', {'success': False, 'error': 'AI Analysis failed.'})
+        return
+    yield sse_event('result', {'success': True, 'data': format_result(paper_data, analysis, url)})
+
+def stream_analysis(paper):
+    """Yield field events as Gemini generates, and return the parsed analysis (None on failure).
+
+    Shares in-flight work with get_analysis(): if the same analysis is already being
+    generated, streamed or not, this waits for that result instead of calling Gemini again.
+    """
+    key = analysis_key(paper)
+    analysis = cache.get(key)
+    if analysis is not None:
+        return analysis
+
+    call, leader = inflight.claim(key)
+    if not leader:
+        try:
+            return call.wait()
+        except Abandoned:
+            return get_analysis(paper)
+
+    error = None
+    try:
+        buffer = ""
+        sent = {}
+        for text in analyze_paper_stream(paper):
+            buffer += text
+            # Values only ever grow, so each event carries just the new suffix
+            for field, value in partial_json_fields(buffer).items():
+                previous = sent.get(field, "")
+                if len(value) > len(previous):
+                    sent[field] = value
+                    yield sse_event('field', {'field': field, 'delta': value[len(previous):]})
+        analysis = json.loads(buffer)
+    except RateLimited as e:
+        error = e
+        raise
+    except Exception as e:
+        logger.error(f"AI Call Failed: {e}")
+    except GeneratorExit:
+        # The client went away mid-generation; hand the key to the next waiter
+        error = Abandoned(key)
+        raise
+    finally:
+        if analysis and is_complete(paper):
+            cache.set(key, analysis)
+        inflight.resolve(key, call, analysis, error)
+    return analysis
+
+# --- Batch Processing ---
+@bp.route('/process/batch', methods=['POST'])
+def process_batch():
+    data = request.get_json(silent=True) or {}
+    refs = data.get('urls')
+    if not isinstance(refs, list) or not refs:
+        return jsonify({'success': False, 'error': 'Please provide a list of arXiv URLs or IDs'})
+    if len(refs) > BATCH_MAX_URLS:
+        return jsonify({'success': False, 'error': f'A batch may contain at most {BATCH_MAX_URLS} papers'})
+
+    items = []
+    for ref in refs:
+        ref = str(ref).strip()
+        # Accept bare IDs ("2403.10235v2") as well as full URLs
+        items.append((ref, parse_arxiv_url(ref) or parse_arxiv_url(f"arxiv.org/abs/{ref}")))
+    return Response(stream_with_context(batch_results(items)), mimetype='application/x-ndjson')
+
+def batch_results(items):
+    """Yield one NDJSON line per paper, in completion order."""
+    pending = []
+    for ref, parsed in items:
+        if parsed:
+            pending.append((ref, parsed))
+        else:
+            yield json.dumps({'url': ref, 'success': False, 'error': 'Please provide a valid arXiv URL'}) + "\n"
+
+    # Only papers missing from the crawl cache need a metadata lookup
+    uncached = sorted({p for _, p in pending if cache.get(f"crawl:{p[0]}{p[1]}") is None})
+    metadata = {}
+    for chunk in chunked(uncached):
+        try:
+            metadata.update(fetch_metadata(chunk))
+        except (FetchError, RateLimited, ET.ParseError) as e:
+            logger.error(f"Metadata Error: {e}")
+
+    futures = [
+        batch_executor.submit(process_batch_item, ref, arxiv_id, version,
+                              metadata.get(f"{arxiv_id}{version}"))
+        for ref, (arxiv_id, version) in pending
+    ]
+    try:
+        for future in as_completed(futures):
+            yield json.dumps(future.result()) + "\n"
+    finally:
+        # The client went away (GeneratorExit): don't spend Gemini calls nobody will read
+        for future in futures:
+            future.cancel()
+
+def process_batch_item(ref, arxiv_id, version, meta):
+    try:
+        return _process_batch_item(ref, arxiv_id, version, meta)
+    except RateLimited as e:
+        return {'url': ref, 'success': False, 'error': BUSY_MESSAGE, 'retry_after': math.ceil(e.retry_after)}
+
+def _process_batch_item(ref, arxiv_id, version, meta):
+    key = f"crawl:{arxiv_id}{version}"
+    paper_data = cache.get(key)
+    if paper_data is None:
+        # Same key as get_paper(), so duplicates in a batch or a concurrent /process crawl once
+        paper_data = inflight.do(key, _crawl_batch_item, key, arxiv_id, version, meta)
+    if not paper_data:
+        return {'url': ref, 'success': False, 'error': 'Could not fetch paper details'}
+
+    with gemini_slots:
+        analysis = get_analysis(paper_data)
+    if not analysis:
+        return {'url': ref, 'success': False, 'error': 'AI Analysis failed.'}
+    return {'url': ref, 'success': True, 'data': format_result(paper_data, analysis, paper_data['url'])}
+
+def _crawl_batch_item(key, arxiv_id, version, meta):
+    if meta is None:
+        # The bulk lookup failed or skipped this ID; crawl its abs page like /process would
+        with arxiv_slots:
+            return _crawl_and_cache(key, f"arxiv.org/abs/{arxiv_id}{version}")
+    # Metadata came from the export API in bulk, so only the PDF is fetched per paper
+    with arxiv_slots:
+        pdf_text = extract_pdf_text(canonical_pdf_url(arxiv_id, version))
+    paper_data = {
+        'title': meta['title'],
+        'authors': meta['authors'],
+        'abstract': meta['abstract'],
+        'url': canonical_abs_url(arxiv_id, version),
+        'pdf_text': pdf_text,
+        'arxiv_id': arxiv_id,
+        'version': version
+    }
+    if is_complete(paper_data):
+        cache.set(key, paper_data)
+    return paper_data
+
+# --- Async Jobs ---
+def run_job(url, progress):
+    try:
+        progress('crawl')
+        paper_data = get_paper(url)
+        if not paper_data:
+            raise JobError('Could not fetch paper details')
+
+        progress('analysis')
+        analysis = get_analysis(paper_data)
+        if not analysis:
+            raise JobError('AI Analysis failed.')
+    except RateLimited as e:
+        raise RetryLater(e.retry_after)
+
+    return format_result(paper_data, analysis, url)
+
+def jobs_unavailable():
+    # Job workers are opt-in (create_app(jobs=True) or PAPERSHARE_JOBS=1)
+    response = jsonify({'success': False, 'error': 'Background jobs are not enabled on this server'})
+    response.status_code = 503
+    return response
+
+@bp.route('/jobs', methods=['POST'])
+def create_job():
+    if job_queue is None:
+        return jobs_unavailable()
+    data = request.get_json(silent=True) or {}
+    url = data.get('url', '').strip()
+    if not url or not parse_arxiv_url(url):
+        return jsonify({'success': False, 'error': 'Please provide a valid arXiv URL'})
+
+    job_id = job_queue.submit(url)
+    response = jsonify({'success': True, 'job_id': job_id, 'status_url': url_for('papershare.get_job', job_id=job_id)})
+    response.status_code = 202
+    return response
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    if job_queue is None:
+        return jobs_unavailable()
+    # ?wait=N long-polls for up to N seconds until the job moves past ?stage=
+    wait = request.args.get('wait', type=float)
+    if wait:
+        job = job_queue.wait(job_id, wait, request.args.get('stage'))
+    else:
+        job = job_queue.get(job_id)
+
+    if job is None:
+        response = jsonify({'success': False, 'error': 'Job not found'})
+        response.status_code = 404
+        return response
+    return jsonify({'success': True, 'job': job})
+
+# --- Application Factory ---
+job_queue = None
+
+def start_job_workers():
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(run_job)
+        job_queue.start()
+    return job_queue
+
+def warm_up():
+    """Import heavy modules, build the Gemini client and start PDF workers before traffic arrives."""
+    started = time.perf_counter()
+    get_client()
+    from bs4 import BeautifulSoup  # noqa: F401
+    from sklearn.feature_extraction.text import TfidfVectorizer  # noqa: F401
+    warm_up_pool()
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+def create_app(warm=None, jobs=None):
+    """Build the Flask app. Heavy modules load lazily unless warm (or PAPERSHARE_WARMUP=1) is set,
+    in which case they load here, before the server starts accepting requests.
+
+    Background job workers only run with jobs (or PAPERSHARE_JOBS=1): they need a writable
+    database and a long-lived process, which serverless platforms don't provide.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+
+    if jobs is None:
+        jobs = os.environ.get('PAPERSHARE_JOBS') == '1'
+    if jobs:
+        start_job_workers()
+
+    if warm is None:
+        warm = os.environ.get('PAPERSHARE_WARMUP') == '1'
+    if warm:
+        warm_up()
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5001)
+    # The debug reloader runs this twice; only its child (WERKZEUG_RUN_MAIN) serves requests
+    create_app(jobs=os.environ.get('WERKZEUG_RUN_MAIN') == 'true').run(debug=True, port=5001)
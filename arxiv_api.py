@@ -0,0 +1,47 @@
+import os
+import logging
+import xml.etree.ElementTree as ET
+from fetcher import fetch
+from cache import ARXIV_EXPORT_URL, parse_arxiv_url
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+ID_LIST_CHUNK = int(os.environ.get('ARXIV_ID_LIST_CHUNK', 50))
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+def _clean(text):
+    return ' '.join((text or '').split())
+
+# --- Bulk Metadata via the Atom Export API ---
+def fetch_metadata(refs):
+    """Look up title/authors/abstract for (arxiv_id, version) pairs in a single API call.
+
+    Returns a dict keyed by both the versioned and the bare ID, so callers can look
+    up whichever form they asked for.
+    """
+    id_list = ','.join(f"{arxiv_id}{version}" for arxiv_id, version in refs)
+    response = fetch(f"{ARXIV_EXPORT_URL}?id_list={id_list}&max_results={len(refs)}")
+    root = ET.fromstring(response.content)
+
+    metadata = {}
+    for entry in root.iter(f'{ATOM}entry'):
+        parsed = parse_arxiv_url(entry.findtext(f'{ATOM}id'))
+        if not parsed:
+            # The API reports bad IDs as an entry pointing at its errors page
+            logger.warning(f"arXiv API error entry: {_clean(entry.findtext(f'{ATOM}summary'))}")
+            continue
+        arxiv_id, version = parsed
+        meta = {
+            'title': _clean(entry.findtext(f'{ATOM}title')),
+            'authors': ', '.join(_clean(a.findtext(f'{ATOM}name')) for a in entry.iter(f'{ATOM}author')),
+            'abstract': _clean(entry.findtext(f'{ATOM}summary')),
+        }
+        metadata[f"{arxiv_id}{version}"] = meta
+        metadata[arxiv_id] = meta
+    return metadata
+
+def chunked(items, size=ID_LIST_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,265 @@
+"""ASGI entry point: ``uvicorn asgi:app``.
+
+/process and /process/stream run natively on the event loop, so in-flight arXiv and
+Gemini calls are coroutines rather than one blocked OS thread each. Blocking work
+(SQLite, HTML parsing, context selection) is pushed to worker threads. The remaining
+routes (batch, jobs, index) are served by the same Flask app the WSGI entry points use.
+"""
+import os
+import json
+import math
+import time
+import asyncio
+import contextlib
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+import app as papershare
+from cache import parse_arxiv_url, canonical_abs_url, canonical_pdf_url
+from fetcher import FetchError, aconditional_get, aclose_async_client
+from limits import Abandoned, AsyncSingleFlight, RateLimited, gemini_limiter
+from pdf_extract import PdfExtractionError, aextract_text_from_response
+from sse import sse_event, partial_json_fields
+
+logger = papershare.logger
+cache = papershare.cache
+validators = papershare.validators
+inflight = AsyncSingleFlight()
+
+# --- Async Pipeline ---
+async def extract_pdf_text(pdf_url):
+    try:
+        return await aconditional_get(pdf_url, aextract_text_from_response, validators, stream=True)
+    except (FetchError, PdfExtractionError) as e:
+        logger.warning(f"PDF Error: {e}")
+        return ""
+
+async def parse_abs_page(response):
+    # BeautifulSoup parsing is CPU work; the body is already read, so a thread can have it
+    return await asyncio.to_thread(papershare.parse_abs_page, response)
+
+async def crawl_arxiv(url):
+    arxiv_id, version = parse_arxiv_url(url)
+    abs_url = canonical_abs_url(arxiv_id, version)
+    pdf_task = asyncio.ensure_future(extract_pdf_text(canonical_pdf_url(arxiv_id, version)))
+    try:
+        meta = await aconditional_get(abs_url, parse_abs_page, validators)
+    except (FetchError, ValueError) as e:
+        logger.error(f"Crawl Error: {e}")
+        pdf_task.cancel()
+        return None
+
+    return {
+        'title': meta['title'],
+        'authors': meta['authors'],
+        'abstract': meta['abstract'],
+        'url': abs_url,
+        'pdf_text': await pdf_task,
+        'arxiv_id': arxiv_id,
+        'version': version
+    }
+
+async def prepare_generation(paper):
+    """Return (client, prompt, config). Building the client the first time imports
+    google-genai and context selection is CPU work, so both run in a worker thread."""
+    client = await asyncio.to_thread(papershare.get_client)
+    prompt = await asyncio.to_thread(papershare.build_prompt, paper)
+    return client, prompt, papershare.generation_config()
+
+async def analyze_paper(paper):
+    await gemini_limiter.acquire_async()
+    try:
+        client, prompt, config = await prepare_generation(paper)
+        response = await client.aio.models.generate_content(
+            model=papershare.MODEL_ID,
+            contents=prompt,
+            config=config
+        )
+        return json.loads(response.text)
+    except Exception as e:
+        logger.error(f"AI Call Failed: {e}")
+        return None
+
+async def analyze_paper_stream(paper):
+    """Yield the raw JSON text chunks as Gemini generates them."""
+    await gemini_limiter.acquire_async()
+    client, prompt, config = await prepare_generation(paper)
+    async for chunk in await client.aio.models.generate_content_stream(
+        model=papershare.MODEL_ID,
+        contents=prompt,
+        config=config
+    ):
+        if chunk.text:
+            yield chunk.text
+
+# SQLite reads and writes block, so the cache is only touched from worker threads
+async def get_paper(url):
+    arxiv_id, version = parse_arxiv_url(url)
+    key = f"crawl:{arxiv_id}{version}"
+    paper = await asyncio.to_thread(cache.get, key)
+    if paper is None:
+        paper = await inflight.do(key, _crawl_and_cache, key, url)
+    return paper
+
+async def _crawl_and_cache(key, url):
+    paper = await crawl_arxiv(url)
+    if papershare.is_complete(paper):
+        await asyncio.to_thread(cache.set, key, paper)
+    return paper
+
+async def get_analysis(paper):
+    key = papershare.analysis_key(paper)
+    analysis = await asyncio.to_thread(cache.get, key)
+    if analysis is None:
+        analysis = await inflight.do(key, _analyze_and_cache, key, paper)
+    return analysis
+
+async def _analyze_and_cache(key, paper):
+    analysis = await analyze_paper(paper)
+    if analysis and papershare.is_complete(paper):
+        await asyncio.to_thread(cache.set, key, analysis)
+    return analysis
+
+async def stream_analysis(paper):
+    """Async twin of app.stream_analysis. An async generator can't return a value, so this
+    yields ('event', sse_text) pairs and finishes with ('result', analysis)."""
+    key = papershare.analysis_key(paper)
+    analysis = await asyncio.to_thread(cache.get, key)
+    if analysis is not None:
+        yield 'result', analysis
+        return
+
+    future, leader = inflight.claim(key)
+    if not leader:
+        try:
+            analysis = await inflight.wait(key, future)
+        except Abandoned:
+            analysis = await get_analysis(paper)
+        yield 'result', analysis
+        return
+
+    error = None
+    try:
+        buffer = ""
+        sent = {}
+        async for text in analyze_paper_stream(paper):
+            buffer += text
+            # Values only ever grow, so each event carries just the new suffix
+            for field, value in partial_json_fields(buffer).items():
+                previous = sent.get(field, "")
+                if len(value) > len(previous):
+                    sent[field] = value
+                    yield 'event', sse_event('field', {'field': field, 'delta': value[len(previous):]})
+        analysis = json.loads(buffer)
+        if papershare.is_complete(paper):
+            await asyncio.to_thread(cache.set, key, analysis)
+    except RateLimited as e:
+        error = e
+        raise
+    except Exception as e:
+        logger.error(f"AI Call Failed: {e}")
+    except (GeneratorExit, asyncio.CancelledError):
+        # The client went away mid-generation; hand the key to the next waiter
+        error = Abandoned(key)
+        raise
+    finally:
+        inflight.resolve(key, future, analysis, error)
+    yield 'result', analysis
+
+# --- Routes ---
+async def request_url(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    return (data.get('url') or '').strip() if isinstance(data, dict) else ''
+
+async def process(request):
+    url = await request_url(request)
+    if not url or not parse_arxiv_url(url):
+        return JSONResponse({'success': False, 'error': 'Please provide a valid arXiv URL'})
+
+    timings = {}
+    try:
+        started = time.perf_counter()
+        paper_data = await get_paper(url)
+        timings['crawl'] = time.perf_counter() - started
+        if not paper_data:
+            return JSONResponse({'success': False, 'error': 'Could not fetch paper details'})
+
+        started = time.perf_counter()
+        analysis = await get_analysis(paper_data)
+        timings['analysis'] = time.perf_counter() - started
+        if not analysis:
+            return JSONResponse({'success': False, 'error': 'AI Analysis failed.'})
+    except RateLimited as e:
+        logger.warning(f"Rejected request: {e}")
+        retry_after = math.ceil(e.retry_after)
+        return JSONResponse({'success': False, 'error': papershare.BUSY_MESSAGE, 'retry_after': retry_after},
+                            status_code=429, headers={'Retry-After': str(retry_after)})
+
+    return JSONResponse(
+        {'success': True, 'data': papershare.format_result(paper_data, analysis, url)},
+        headers={'Server-Timing': ', '.join(
+            f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()
+        )},
+    )
+
+async def process_stream(request):
+    url = await request_url(request)
+    return StreamingResponse(stream_pipeline(url), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+async def stream_pipeline(url):
+    """Async twin of app.stream_pipeline; emits the same events."""
+    if not url or not parse_arxiv_url(url):
+        yield sse_event('error', {'success': False, 'error': 'Please provide a valid arXiv URL'})
+        return
+
+    analysis = None
+    try:
+        yield sse_event('stage', {'stage': 'crawl'})
+        paper_data = await get_paper(url)
+        if not paper_data:
+            yield sse_event('error', {'success': False, 'error': 'Could not fetch paper details'})
+            return
+        yield sse_event('paper', {'paper_title': paper_data['title'], 'authors': paper_data['authors']})
+
+        yield sse_event('stage', {'stage': 'analysis'})
+        async for kind, value in stream_analysis(paper_data):
+            if kind == 'result':
+                analysis = value
+            else:
+                yield value
+    except RateLimited as e:
+        yield sse_event('error', {'success': False, 'error': papershare.BUSY_MESSAGE,
+                                  'retry_after': math.ceil(e.retry_after)})
+        return
+
+    if not analysis:
+        yield sse_event('error', {'success': False, 'error': 'AI Analysis failed.'})
+        return
+    yield sse_event('result', {'success': True, 'data': papershare.format_result(paper_data, analysis, url)})
+
+# --- Application ---
+@contextlib.asynccontextmanager
+async def lifespan(_):
+    if os.environ.get('PAPERSHARE_WARMUP') == '1':
+        await asyncio.to_thread(papershare.warm_up)
+    yield
+    await aclose_async_client()
+
+def create_asgi_app():
+    # Warm-up runs in the lifespan hook here, so the Flask factory must not start its own
+    flask_app = papershare.create_app(warm=False)
+    return Starlette(
+        routes=[
+            Route('/process', process, methods=['POST']),
+            Route('/process/stream', process_stream, methods=['POST']),
+            Mount('/', app=WSGIMiddleware(flask_app)),
+        ],
+        lifespan=lifespan,
+    )
+
+app = create_asgi_app()
@@ -0,0 +1,62 @@
+"""Measure PaperShare cold start: time to import and build the app, and idle memory.
+
+Each run is a fresh interpreter, so nothing is shared between runs.
+
+    python -m bench.coldstart --runs 5
+    python -m bench.coldstart --entry asgi --warm
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+if {entry!r} == 'asgi':
+    import asgi
+else:
+    import app
+    app.create_app(warm=False)
+ready = time.perf_counter() - started
+if {warm!r}:
+    import app
+    app.warm_up()
+warm = time.perf_counter() - started
+with open('/proc/self/status') as f:
+    rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+print(json.dumps({{'ready_s': ready, 'warm_s': warm, 'rss_mb': rss_kb / 1024}}))
+"""
+
+def run_once(entry, warm, env):
+    output = subprocess.run([sys.executable, '-c', PROBE.format(entry=entry, warm=warm)],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start time and idle memory for PaperShare.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--entry', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--warm', action='store_true', help='also run the warm-up hook before sampling memory')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Throwaway cache/job database, and no .env-driven warm-up behind our back
+        env = dict(os.environ, PAPERSHARE_WARMUP='0', CACHE_DB_PATH=os.path.join(tmp, 'coldstart.db'))
+        env.setdefault('GEMINI_API_KEY', 'coldstart')
+        runs = [run_once(args.entry, args.warm, env) for _ in range(args.runs)]
+
+    for field, unit in (('ready_s', 's'), ('warm_s', 's'), ('rss_mb', 'MB')):
+        if field == 'warm_s' and not args.warm:
+            continue
+        values = [run[field] for run in runs]
+        print(f"{field:>8}: median {statistics.median(values):.3f} {unit}, "
+              f"min {min(values):.3f}, max {max(values):.3f} over {len(values)} runs")
+
+if __name__ == '__main__':
+    main()
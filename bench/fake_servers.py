@@ -0,0 +1,177 @@
+"""Local stand-ins for arXiv and the Gemini API.
+
+arXiv server:  GET /abs/<id>, GET /pdf/<id>, GET /api/query?id_list=...
+Gemini server: POST /v1beta/models/<model>:generateContent
+               POST /v1beta/models/<model>:streamGenerateContent?alt=sse
+
+Each upstream has its own latency, failure rate and response size, so the app can be
+benchmarked with no network access. Run ``python -m bench.fake_servers --help``.
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from bench import corpus
+
+ARXIV_PATH_RE = re.compile(r'^/(abs|pdf)/(.+?)(v\d+)?(\.pdf)?$')
+
+class UpstreamProfile:
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+
+    def delay(self):
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+    def should_fail(self):
+        return random.random() < self.failure_rate
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_failure(self):
+        self.send_body(503, b'upstream unavailable', 'text/plain', {'Retry-After': '1'})
+
+# --- Fake arXiv ---
+def make_arxiv_handler(profile, pdf_pages, pdf_padding_kb):
+    @lru_cache(maxsize=1024)
+    def pdf_bytes(arxiv_id):
+        return corpus.render_pdf(corpus.get_paper(arxiv_id), pages=pdf_pages, padding_kb=pdf_padding_kb)
+
+    class ArxivHandler(QuietHandler):
+        def do_GET(self):
+            profile.delay()
+            if profile.should_fail():
+                return self.send_failure()
+
+            parsed = urlparse(self.path)
+            if parsed.path == '/api/query':
+                ids = parse_qs(parsed.query).get('id_list', [''])[0].split(',')
+                papers = [corpus.get_paper(re.sub(r'v\d+$', '', i)) for i in ids if i]
+                return self.send_body(200, corpus.render_atom(papers).encode(), 'application/atom+xml')
+
+            match = ARXIV_PATH_RE.match(parsed.path)
+            if not match:
+                return self.send_body(404, b'not found', 'text/plain')
+            kind, arxiv_id = match.group(1), match.group(2)
+            etag = f'"{kind}-{arxiv_id}-{pdf_pages}-{pdf_padding_kb}"'
+            if self.headers.get('If-None-Match') == etag:
+                return self.send_body(304, b'', 'text/plain', {'ETag': etag})
+
+            if kind == 'abs':
+                body = corpus.render_abs(corpus.get_paper(arxiv_id)).encode()
+                return self.send_body(200, body, 'text/html; charset=utf-8', {'ETag': etag})
+            return self.send_body(200, pdf_bytes(arxiv_id), 'application/pdf', {'ETag': etag})
+
+    return ArxivHandler
+
+# --- Fake Gemini ---
+def fake_analysis(response_kb):
+    padding = ' '.join(['Researchers keep pushing the field forward.'] * max(response_kb * 1024 // 44, 1))
+    return {
+        'headline': '🚀 New paper just dropped',
+        'linkedin_post': f'Why I am reading this.\n\nThe breakthrough.\n\nHow it works. {padding}\n\nWhat do you think?',
+        'twitter_thread': '1/ Credit to the researchers.\n2/ How it works.\n3/ Why it matters.',
+        'novice_analogy': 'It is like a dishwasher that learns which plates need more rinsing.',
+        'key_takeaway': 'The method beats strong baselines at a fraction of the cost.',
+        'hashtags': ['AI', 'Research', 'MachineLearning', 'arXiv', 'PaperShare'],
+    }
+
+def candidate(text):
+    return {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]},
+                            'finishReason': 'STOP', 'index': 0}]}
+
+def make_gemini_handler(profile, response_kb, stream_chunks):
+    text = json.dumps(fake_analysis(response_kb))
+
+    class GeminiHandler(QuietHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if profile.should_fail():
+                profile.delay()
+                return self.send_failure()
+
+            if ':streamGenerateContent' in self.path:
+                return self.stream(text)
+            if ':generateContent' in self.path:
+                profile.delay()
+                return self.send_body(200, json.dumps(candidate(text)).encode(), 'application/json')
+            return self.send_body(404, b'not found', 'text/plain')
+
+        def stream(self, text):
+            # Spread the configured latency over the chunks, like token-by-token generation
+            size = -(-len(text) // stream_chunks)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(text), size):
+                time.sleep(profile.latency / stream_chunks)
+                event = f"data: {json.dumps(candidate(text[i:i + size]))}\r\n\r\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+    return GeminiHandler
+
+# --- Entry Point ---
+def serve(handler, port):
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def add_arguments(parser):
+    parser.add_argument('--arxiv-port', type=int, default=8801)
+    parser.add_argument('--gemini-port', type=int, default=8802)
+    parser.add_argument('--arxiv-latency', type=float, default=0.05, help='seconds per arXiv response')
+    parser.add_argument('--arxiv-failure-rate', type=float, default=0.0)
+    parser.add_argument('--pdf-pages', type=int, default=12)
+    parser.add_argument('--pdf-padding-kb', type=int, default=0, help='extra PDF bytes, in KiB')
+    parser.add_argument('--gemini-latency', type=float, default=1.0, help='seconds per generation')
+    parser.add_argument('--gemini-failure-rate', type=float, default=0.0)
+    parser.add_argument('--gemini-response-kb', type=int, default=2)
+    parser.add_argument('--gemini-stream-chunks', type=int, default=20)
+    parser.add_argument('--jitter', type=float, default=0.2, help='latency jitter as a fraction')
+
+def start(args):
+    arxiv = UpstreamProfile(args.arxiv_latency, args.arxiv_latency * args.jitter, args.arxiv_failure_rate)
+    gemini = UpstreamProfile(args.gemini_latency, args.gemini_latency * args.jitter, args.gemini_failure_rate)
+    return [
+        serve(make_arxiv_handler(arxiv, args.pdf_pages, args.pdf_padding_kb), args.arxiv_port),
+        serve(make_gemini_handler(gemini, args.gemini_response_kb, args.gemini_stream_chunks), args.gemini_port),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='Run fake arXiv and Gemini servers.')
+    add_arguments(parser)
+    args = parser.parse_args()
+    start(args)
+    print(f"Fake arXiv on http://127.0.0.1:{args.arxiv_port}, "
+          f"fake Gemini on http://127.0.0.1:{args.gemini_port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""Replay /process traffic against PaperShare and report throughput, latency and memory.
+
+By default this starts the fake upstreams (bench/fake_servers.py) and a fresh app
+process per concurrency level, with its own empty cache database, so levels are
+comparable. Per-stage latencies come from the app's Server-Timing header.
+
+    python -m bench.loadtest --concurrency 1,4,16 --output results.json
+    python -m bench.loadtest --baseline results.json   # fail on regressions
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from bench import fake_servers
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRAFFIC = os.path.join(REPO_ROOT, 'bench', 'traffic.jsonl')
+STAGES = ('total', 'crawl', 'analysis')
+
+# --- Process Management ---
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+def start_app(args, db_path):
+    env = dict(
+        os.environ,
+        CACHE_DB_PATH=db_path,
+        ARXIV_BASE_URL=f"http://127.0.0.1:{args.arxiv_port}",
+        ARXIV_EXPORT_URL=f"http://127.0.0.1:{args.arxiv_port}/api/query",
+        GEMINI_BASE_URL=f"http://127.0.0.1:{args.gemini_port}",
+        GEMINI_API_KEY='bench',
+    )
+    if not args.keep_limits:
+        # Measure the app itself, not the upstream admission control
+        env.update(GEMINI_RATE='10000', GEMINI_BURST='10000', GEMINI_MAX_QUEUE='10000',
+                   ARXIV_RATE='10000', ARXIV_BURST='10000', ARXIV_MAX_QUEUE='10000')
+    if args.asgi:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(args.app_port)]
+    else:
+        command = [sys.executable, '-c', "import app; app.create_app().run(host='127.0.0.1', "
+                                         f"port={args.app_port}, threaded=True)"]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(args.app_port)
+    return process
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+# --- Memory Sampling ---
+def _proc_tree(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            for child in f.read().split():
+                pids.extend(_proc_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+def _rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+class RssSampler(threading.Thread):
+    """Track the peak combined RSS of a process and its children (Linux /proc only)."""
+
+    def __init__(self, pid, interval=0.05):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak_kb = max(self.peak_kb, sum(_rss_kb(p) for p in _proc_tree(self.pid)))
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+# --- Traffic ---
+def load_traffic(path, count):
+    with open(path, encoding='utf-8') as f:
+        urls = [json.loads(line)['url'] for line in f if line.strip()]
+    if not urls:
+        raise SystemExit(f"No traffic in {path}")
+    return [urls[i % len(urls)] for i in range(count or len(urls))]
+
+def parse_server_timing(header):
+    timings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.startswith('dur='):
+            timings[name] = float(params[4:]) / 1000
+    return timings
+
+def run_level(target, urls, concurrency):
+    local = threading.local()
+
+    def one(url):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.post(f"{target}/process", json={'url': url}, timeout=120)
+            ok = response.status_code == 200 and response.json().get('success', False)
+            timings = parse_server_timing(response.headers.get('Server-Timing'))
+            status = response.status_code
+        except requests.RequestException:
+            ok, timings, status = False, {}, 'error'
+        timings['total'] = time.perf_counter() - started
+        return ok, status, timings
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, urls))
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        'concurrency': concurrency,
+        'requests': len(results),
+        'errors': sum(1 for ok, _, _ in results if not ok),
+        'statuses': {},
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 2),
+    }
+    for _, status, _ in results:
+        summary['statuses'][str(status)] = summary['statuses'].get(str(status), 0) + 1
+    for stage in STAGES:
+        values = sorted(t[stage] for ok, _, t in results if ok and stage in t)
+        summary[stage] = {f'p{q}': round(percentile(values, q) * 1000, 1) for q in (50, 95, 99)}
+    return summary
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+# --- Reporting ---
+def print_report(levels):
+    header = f"{'conc':>5} {'reqs':>5} {'errs':>5} {'req/s':>7}"
+    for stage in STAGES:
+        header += f" {stage + ' p50/p95/p99 (ms)':>30}"
+    header += f" {'peak RSS':>10}"
+    print(header)
+    for level in levels:
+        row = f"{level['concurrency']:>5} {level['requests']:>5} {level['errors']:>5} {level['throughput_rps']:>7}"
+        for stage in STAGES:
+            p = level[stage]
+            row += f" {p['p50']:>10}/{p['p95']}/{p['p99']:<10}".rjust(31)
+        peak = level.get('peak_rss_mb')
+        row += f" {peak if peak is not None else '-':>8} MB"
+        print(row)
+
+def compare(levels, baseline_path, max_regression):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {level['concurrency']: level for level in json.load(f)['levels']}
+
+    failures = []
+    for level in levels:
+        base = baseline.get(level['concurrency'])
+        if not base:
+            continue
+        if level['total']['p95'] > base['total']['p95'] * (1 + max_regression):
+            failures.append(f"c={level['concurrency']}: p95 {base['total']['p95']} -> {level['total']['p95']} ms")
+        if level['throughput_rps'] < base['throughput_rps'] * (1 - max_regression):
+            failures.append(f"c={level['concurrency']}: throughput {base['throughput_rps']} -> "
+                            f"{level['throughput_rps']} req/s")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for PaperShare.')
+    parser.add_argument('--traffic', default=DEFAULT_TRAFFIC, help='JSONL file with one {"url": ...} per line')
+    parser.add_argument('--requests', type=int, default=0, help='requests per level (default: one pass)')
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--app-port', type=int, default=8800)
+    parser.add_argument('--target', help='benchmark an already running app instead of starting one')
+    parser.add_argument('--keep-limits', action='store_true', help="keep the app's upstream rate limits")
+    parser.add_argument('--asgi', action='store_true', help='serve the app with uvicorn asgi:app instead of Flask')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='compare against a previous --output file')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    fake_servers.add_arguments(parser)
+    args = parser.parse_args()
+
+    urls = load_traffic(args.traffic, args.requests)
+    servers = [] if args.target else fake_servers.start(args)
+    levels = []
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            if args.target:
+                levels.append(run_level(args.target, urls, concurrency))
+                continue
+            with tempfile.TemporaryDirectory() as tmp:
+                process = start_app(args, os.path.join(tmp, 'bench.db'))
+                sampler = RssSampler(process.pid)
+                sampler.start()
+                try:
+                    level = run_level(f"http://127.0.0.1:{args.app_port}", urls, concurrency)
+                finally:
+                    sampler.stop()
+                    stop(process)
+                level['peak_rss_mb'] = round(sampler.peak_kb / 1024, 1)
+                levels.append(level)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    print_report(levels)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'levels': levels}, f, indent=2)
+    if args.baseline and not compare(levels, args.baseline, args.max_regression):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+CACHE_DB_PATH = os.environ.get('CACHE_DB_PATH', 'research_papers.db')
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 7 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 5000))
+HOT_CACHE_SIZE = int(os.environ.get('HOT_CACHE_SIZE', 256))
+# ETag/Last-Modified validators outlive the results they revalidate, or they'd never be used
+VALIDATOR_TTL = int(os.environ.get('VALIDATOR_TTL', 90 * 24 * 3600))
+VALIDATOR_MAX_ENTRIES = int(os.environ.get('VALIDATOR_MAX_ENTRIES', 2 * CACHE_MAX_ENTRIES))
+# Where canonical abs/PDF URLs are fetched from (overridden by the offline benchmarks)
+ARXIV_BASE_URL = os.environ.get('ARXIV_BASE_URL', 'https://arxiv.org').rstrip('/')
+ARXIV_EXPORT_URL = os.environ.get('ARXIV_EXPORT_URL', 'https://export.arxiv.org/api/query')
+
+# New-style IDs (2403.10235) and old-style IDs (hep-th/9901001, math.GT/0309136)
+ARXIV_ID_RE = re.compile(
+    r'arxiv\.org/(?:abs|pdf)/'
+    r'(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})'
+    r'(v\d+)?',
+    re.IGNORECASE,
+)
+
+# --- arXiv URL Normalization ---
+def parse_arxiv_url(url):
+    """Return (arxiv_id, version) for any abs/pdf/versioned arXiv URL, or None."""
+    match = ARXIV_ID_RE.search(url or '')
+    if not match:
+        return None
+    return match.group(1), (match.group(2) or '').lower()
+
+def canonical_abs_url(arxiv_id, version=''):
+    return f"{ARXIV_BASE_URL}/abs/{arxiv_id}{version}"
+
+def canonical_pdf_url(arxiv_id, version=''):
+    return f"{ARXIV_BASE_URL}/pdf/{arxiv_id}{version}"
+
+def prompt_hash(template):
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+# --- Two-tier Result Cache ---
+class ResultCache:
+    """SQLite-backed cache (WAL, TTL, LRU-bounded) with an in-process hot tier."""
+
+    def __init__(self, path=CACHE_DB_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 hot_size=HOT_CACHE_SIZE, table='result_cache'):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        # Holds (value, created_at) so a promoted SQLite hit only lives out its remaining TTL
+        self._hot = TTLCache(maxsize=hot_size, ttl=ttl)
+        self._hot_lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table}(accessed_at)')
+        conn.commit()
+        logger.info(f"Cache database '{self.path}' initialized successfully.")
+
+    def get(self, key):
+        with self._hot_lock:
+            entry = self._hot.get(key)
+        if entry is not None:
+            value, created_at = entry
+            if time.time() - created_at <= self.ttl:
+                return value
+            with self._hot_lock:
+                self._hot.pop(key, None)
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                f'SELECT value, created_at FROM {self.table} WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > self.ttl:
+                conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                conn.commit()
+                return None
+            conn.execute(f'UPDATE {self.table} SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+            value = json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+
+        with self._hot_lock:
+            self._hot[key] = (value, row[1])
+        return value
+
+    def set(self, key, value):
+        now = time.time()
+        with self._hot_lock:
+            self._hot[key] = (value, now)
+        try:
+            conn = self._connect()
+            conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    def _evict(self, conn, now):
+        conn.execute(f'DELETE FROM {self.table} WHERE created_at < ?', (now - self.ttl,))
+        count = conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f'DELETE FROM {self.table} WHERE key IN '
+                f'(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,),
+            )
@@ -0,0 +1,139 @@
+import os
+import re
+
+# --- Configuration ---
+CONTEXT_TOKEN_BUDGET = int(os.environ.get('CONTEXT_TOKEN_BUDGET', 1000))
+# Rough English average for Gemini's tokenizer; good enough for budgeting
+CHARS_PER_TOKEN = 4
+# What analyze_paper used to send: a blind slice of the extracted text
+LEGACY_CONTEXT_CHARS = 5000
+MIN_SENTENCE_CHARS = 40
+# Sentences this similar to the abstract only repeat what the prompt already has
+MAX_ABSTRACT_SIMILARITY = 0.8
+
+# Page furniture PyPDF2 emits as lines of its own (arXiv stamps, notices, bare emails/URLs).
+# Dropped line by line; anything less certain is filtered per sentence, after lines are joined.
+FURNITURE_RE = re.compile(
+    r'^\s*(arXiv:\d|preprint\b|under review\b|copyright\b|©|all rights reserved'
+    r'|\S+@\S+\s*$|(https?://|www\.)\S+\s*$)',
+    re.IGNORECASE,
+)
+BOILERPLATE_RE = re.compile(
+    r'\w@\w|https?://|www\.|arXiv:\d|\bpreprint\b|\bunder review\b|copyright|©|all rights reserved',
+    re.IGNORECASE,
+)
+MAX_BOILERPLATE_CHARS = 120
+# Author affiliations; only looked for before the first heading
+AFFILIATION_RE = re.compile(
+    r'\b(university|institute|department|laboratory|school of|college|inc\.|corporation)\b',
+    re.IGNORECASE,
+)
+REFERENCES_RE = re.compile(r'^\s*(\d+\.?\s*)?(references|bibliography|acknowledg(e)?ments?)\s*$', re.IGNORECASE)
+# Numbered headings are matched case-sensitively, so a body line like
+# "8 heads and a model dimension of 512" doesn't open a section
+HEADING_RE = re.compile(
+    r'^\s*((\d+(\.\d+)*\.?|[IVX]+\.)\s+[A-Z][\w\s\-:,&]{2,60}'
+    r'|(?i:abstract|introduction|related work|background|method(s|ology)?|experiments?|results'
+    r'|discussion|conclusions?))\s*$'
+)
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9(\[])')
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+# --- Segmentation ---
+def segment(pdf_text):
+    """Split extracted PDF text into [(section, [sentences])], dropping boilerplate and references."""
+    sections = [('Preamble', [])]
+    for line in pdf_text.splitlines():
+        line = line.strip()
+        if not line or line.isdigit():
+            continue
+        if REFERENCES_RE.match(line):
+            break
+        if HEADING_RE.match(line) and len(line) < 70:
+            sections.append((line, []))
+            continue
+        if FURNITURE_RE.match(line):
+            continue
+        if len(sections) == 1 and AFFILIATION_RE.search(line) and len(line) < MAX_BOILERPLATE_CHARS:
+            continue
+        sections[-1][1].append(line)
+
+    # Title/author block before the first heading, and the abstract the prompt already has
+    if len(sections) > 1:
+        sections = sections[1:]
+    sections = [(title, lines) for title, lines in sections if title.lower() != 'abstract']
+
+    segmented, seen = [], set()
+    for title, lines in sections:
+        # Re-join hyphenated line breaks before splitting into sentences
+        body = re.sub(r'-\s+(?=[a-z])', '', ' '.join(lines))
+        sentences = []
+        for sentence in SENTENCE_SPLIT_RE.split(body):
+            sentence = sentence.strip()
+            if len(sentence) < MIN_SENTENCE_CHARS or sentence in seen:
+                continue
+            if BOILERPLATE_RE.search(sentence) and len(sentence) < MAX_BOILERPLATE_CHARS:
+                continue
+            seen.add(sentence)
+            sentences.append(sentence)
+        if sentences:
+            segmented.append((title, sentences))
+    return segmented
+
+# --- Ranking & Packing ---
+def rank_sentences(sentences, abstract):
+    """Score each sentence by TF-IDF cosine similarity to the abstract."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+    matrix = vectorizer.fit_transform([abstract, *sentences])
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    return (matrix[1:] @ matrix[0].T).toarray().ravel()
+
+def select_context(pdf_text, abstract, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Pick the sentences most related to the abstract that fit in token_budget.
+
+    Returns (context, stats). Selected sentences keep their document order and are
+    grouped under their section headings.
+    """
+    legacy_tokens = estimate_tokens(pdf_text[:LEGACY_CONTEXT_CHARS])
+    segmented = segment(pdf_text)
+    flat = [(i, title, sentence) for i, (title, sentences) in enumerate(segmented) for sentence in sentences]
+
+    if not flat or not abstract.strip():
+        context = pdf_text[:token_budget * CHARS_PER_TOKEN]
+    else:
+        try:
+            scores = rank_sentences([sentence for _, _, sentence in flat], abstract)
+        except ValueError:
+            # Empty vocabulary, e.g. only stop words survived cleaning
+            scores = [0.0] * len(flat)
+
+        chosen, used = set(), 0
+        for index in sorted(range(len(flat)), key=lambda k: scores[k], reverse=True):
+            if scores[index] > MAX_ABSTRACT_SIMILARITY:
+                continue
+            cost = estimate_tokens(flat[index][2]) + 1
+            if used + cost > token_budget:
+                continue
+            chosen.add(index)
+            used += cost
+
+        parts, current = [], None
+        for index in sorted(chosen):
+            section, title, sentence = flat[index]
+            if section != current:
+                parts.append(f"\n[{title}]")
+                current = section
+            parts.append(sentence)
+        context = '\n'.join(parts).strip()
+
+    stats = {
+        'extracted_tokens': estimate_tokens(pdf_text),
+        'legacy_tokens': legacy_tokens,
+        'context_tokens': estimate_tokens(context),
+    }
+    stats['tokens_saved'] = stats['legacy_tokens'] - stats['context_tokens']
+    return context, stats
@@ -0,0 +1,210 @@
+import os
+import time
+import random
+import asyncio
+import inspect
+import logging
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from cache import ARXIV_BASE_URL, ARXIV_EXPORT_URL
+from limits import ADMISSION_TIMEOUT, arxiv_limiter
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# (connect, read) timeouts in seconds for hosts without their own entry in HOST_TIMEOUTS
+DEFAULT_TIMEOUT = (3.05, 15)
+RETRY_ATTEMPTS = int(os.environ.get('FETCH_RETRY_ATTEMPTS', 3))
+RETRY_BACKOFF = float(os.environ.get('FETCH_RETRY_BACKOFF', 0.5))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Transient transport failures; other requests errors (redirect loops, bad encodings) fail at once
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+# A longer Retry-After gives up instead of parking a request thread for minutes
+MAX_RETRY_AFTER = float(os.environ.get('FETCH_MAX_RETRY_AFTER', ADMISSION_TIMEOUT))
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 16))
+USER_AGENT = 'PaperShare/1.0 (+https://github.com/varun4-here/PaperShare)'
+
+class FetchError(Exception):
+    pass
+
+# --- Shared Session & Worker Pool ---
+session = requests.Session()
+session.headers['User-Agent'] = USER_AGENT
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=FETCH_WORKERS, max_retries=0)
+session.mount('https://', _adapter)
+session.mount('http://', _adapter)
+
+executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='fetch')
+
+def _host(url):
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+# Keyed by the hosts the arXiv endpoints actually point at, so overrides stay rate limited
+HOST_TIMEOUTS = {
+    _host(ARXIV_BASE_URL): (3.05, 15),
+    _host(ARXIV_EXPORT_URL): (3.05, 30),
+}
+HOST_LIMITERS = {
+    _host(ARXIV_BASE_URL): arxiv_limiter,
+    _host(ARXIV_EXPORT_URL): arxiv_limiter,
+}
+
+def timeout_for(url):
+    return HOST_TIMEOUTS.get(_host(url), DEFAULT_TIMEOUT)
+
+def _validator_headers(entry):
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def _store_validated(store, key, response, value):
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if store is not None and (etag or last_modified):
+        store.set(key, {'etag': etag, 'last_modified': last_modified, 'value': value})
+
+def _backoff(url, attempt, last_error, retry_after=None):
+    if retry_after and retry_after.isdigit():
+        if float(retry_after) > MAX_RETRY_AFTER:
+            raise FetchError(f"Giving up on {url}: asked to retry after {retry_after}s ({last_error})")
+        return float(retry_after)
+    # Exponential backoff with full jitter
+    return random.uniform(0, RETRY_BACKOFF * (2 ** attempt))
+
+# --- Fetching ---
+def fetch(url, headers=None, stream=False):
+    """GET with per-host timeouts, rate limits and jittered retries. 304 responses are returned as-is."""
+    limiter = HOST_LIMITERS.get(_host(url))
+    last_error = None
+    for attempt in range(RETRY_ATTEMPTS):
+        if limiter:
+            limiter.acquire()
+        try:
+            response = session.get(url, headers=headers, stream=stream, timeout=timeout_for(url))
+        except RETRYABLE_ERRORS as e:
+            last_error = e
+            retry_after = None
+        except requests.RequestException as e:
+            raise FetchError(f"Request for {url} failed: {e}") from e
+        else:
+            if response.status_code < 400:
+                return response
+            last_error = FetchError(f"HTTP {response.status_code} for {url}")
+            retry_after = response.headers.get('Retry-After')
+            response.close()
+            if response.status_code not in RETRYABLE_STATUS:
+                raise last_error
+
+        if attempt + 1 < RETRY_ATTEMPTS:
+            delay = _backoff(url, attempt, last_error, retry_after)
+            logger.info(f"Retrying {url} in {delay:.2f}s ({last_error})")
+            time.sleep(delay)
+
+    raise FetchError(f"Giving up on {url}: {last_error}")
+
+def conditional_get(url, parse, store=None, stream=False):
+    """Fetch url and return parse(response), revalidating with ETag/Last-Modified.
+
+    The parsed value (not the raw body) is kept in store alongside the validators,
+    so a 304 answer is served without re-downloading or re-parsing.
+    """
+    key = f"http:{url}"
+    entry = store.get(key) if store is not None else None
+
+    response = fetch(url, headers=_validator_headers(entry), stream=stream)
+    if response.status_code == 304 and entry:
+        response.close()
+        return entry['value']
+
+    try:
+        value = parse(response)
+    finally:
+        response.close()
+    _store_validated(store, key, response, value)
+    return value
+
+# --- Async Fetching (ASGI mode) ---
+_async_client = None
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        import httpx
+
+        _async_client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=FETCH_WORKERS),
+            follow_redirects=True,
+        )
+    return _async_client
+
+async def aclose_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+async def afetch(url, headers=None, stream=False):
+    """Async twin of fetch(), on a shared httpx.AsyncClient."""
+    import httpx
+
+    client = get_async_client()
+    limiter = HOST_LIMITERS.get(_host(url))
+    connect, read = timeout_for(url)
+    last_error = None
+    for attempt in range(RETRY_ATTEMPTS):
+        if limiter:
+            await limiter.acquire_async()
+        request = client.build_request('GET', url, headers=headers,
+                                       timeout=httpx.Timeout(read, connect=connect))
+        try:
+            response = await client.send(request, stream=stream)
+        except httpx.TransportError as e:
+            last_error = e
+            retry_after = None
+        except httpx.HTTPError as e:
+            raise FetchError(f"Request for {url} failed: {e}") from e
+        else:
+            if response.status_code < 400:
+                return response
+            last_error = FetchError(f"HTTP {response.status_code} for {url}")
+            retry_after = response.headers.get('Retry-After')
+            await response.aclose()
+            if response.status_code not in RETRYABLE_STATUS:
+                raise last_error
+
+        if attempt + 1 < RETRY_ATTEMPTS:
+            delay = _backoff(url, attempt, last_error, retry_after)
+            logger.info(f"Retrying {url} in {delay:.2f}s ({last_error})")
+            await asyncio.sleep(delay)
+
+    raise FetchError(f"Giving up on {url}: {last_error}")
+
+async def aconditional_get(url, parse, store=None, stream=False):
+    """Async twin of conditional_get(); parse may be a plain or a coroutine function.
+
+    store is a blocking (SQLite) cache, so it is only touched from worker threads.
+    """
+    key = f"http:{url}"
+    entry = await asyncio.to_thread(store.get, key) if store is not None else None
+
+    response = await afetch(url, headers=_validator_headers(entry), stream=stream)
+    if response.status_code == 304 and entry:
+        await response.aclose()
+        return entry['value']
+
+    try:
+        value = parse(response)
+        if inspect.isawaitable(value):
+            value = await value
+    finally:
+        await response.aclose()
+    await asyncio.to_thread(_store_validated, store, key, response, value)
+    return value
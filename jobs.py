@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+JOBS_DB_PATH = os.environ.get('JOBS_DB_PATH', os.environ.get('CACHE_DB_PATH', 'research_papers.db'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+JOB_MAX_WAIT = float(os.environ.get('JOB_MAX_WAIT', 30))
+# A running job whose owner stops renewing its lease for this long is handed to another worker
+JOB_LEASE = float(os.environ.get('JOB_LEASE', 60))
+# A job is failed once it has been claimed this many times (rate-limit retries, lost leases)
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+# Finished jobs are deleted this many seconds after they last changed
+JOB_RETENTION = float(os.environ.get('JOB_RETENTION', 7 * 24 * 3600))
+
+FINISHED = ('done', 'failed')
+
+class JobError(Exception):
+    pass
+
+class RetryLater(Exception):
+    def __init__(self, delay):
+        super().__init__(f"retry in {delay:.1f}s")
+        self.delay = delay
+
+# --- Persistent Job Queue ---
+class JobQueue:
+    """SQLite-backed job queue drained by a pool of background worker threads.
+
+    handler(url, progress) runs one job: it calls progress(stage) as it moves through
+    the pipeline and returns the result payload, raises JobError to fail the job, or
+    raises RetryLater to put it back in the queue.
+
+    Several queues (one per server process) can share a database. A claimed job carries
+    a lease that its owner keeps renewing, and only jobs with an expired lease, whose
+    owner died or hung, are re-queued. Every claim counts as an attempt; a job that would
+    need more than max_attempts fails instead. Finished jobs are pruned after retention.
+    """
+
+    def __init__(self, handler, path=JOBS_DB_PATH, workers=JOB_WORKERS, lease=JOB_LEASE,
+                 max_attempts=JOB_MAX_ATTEMPTS, retention=JOB_RETENTION):
+        self.handler = handler
+        self.path = path
+        self.workers = workers
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+        self._threads = []
+        self._heartbeat_thread = None
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                stages TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                run_after REAL NOT NULL,
+                claimed_by TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+        # Databases created before leases existed
+        if 'claimed_by' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN claimed_by TEXT')
+        if 'lease_expires' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN lease_expires REAL NOT NULL DEFAULT 0')
+        if 'attempts' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, run_after)')
+
+    # --- Public API ---
+    def submit(self, url):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            'INSERT INTO jobs (id, url, status, stage, stages, run_after, created_at, updated_at) '
+            "VALUES (?, ?, 'queued', 'queued', ?, ?, ?, ?)",
+            (job_id, url, json.dumps({'queued': now}), now, now, now),
+        )
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'id': row['id'],
+            'url': row['url'],
+            'status': row['status'],
+            'stage': row['stage'],
+            'stages': json.loads(row['stages']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        return job
+
+    def wait(self, job_id, timeout, seen_stage=None):
+        """Long-poll: return once the job leaves seen_stage (default: its current stage)
+        or finishes, or on timeout."""
+        deadline = time.monotonic() + min(timeout, JOB_MAX_WAIT)
+        with self._changed:
+            while True:
+                job = self.get(job_id)
+                if job is not None and seen_stage is None:
+                    seen_stage = job['stage']
+                if job is None or job['status'] in FINISHED or job['stage'] != seen_stage:
+                    return job
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return job
+                # Also re-check periodically in case another process updated the job
+                self._changed.wait(min(remaining, JOB_POLL_INTERVAL))
+
+    def start(self):
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+            self._heartbeat_thread.start()
+        for i in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    # --- Workers ---
+    def _claim(self):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            # Jobs whose owner died or hung mid-flight go back to the queue, unless that
+            # was their last attempt: a job that keeps killing its worker must not loop forever
+            abandoned = conn.execute(
+                "UPDATE jobs SET status = 'failed', stage = 'failed', claimed_by = NULL, "
+                "stages = json_set(stages, '$.failed', ?), error = ?, updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, 'Processing was interrupted too many times', now, now, self.max_attempts),
+            ).rowcount
+            recovered = conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'queued', claimed_by = NULL "
+                "WHERE status = 'running' AND lease_expires < ?",
+                (now,),
+            ).rowcount
+            if abandoned or recovered:
+                logger.info(f"Re-queued {recovered} and failed {abandoned} job(s) with an expired lease.")
+            row = conn.execute(
+                "SELECT id, url, stages, attempts FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                'ORDER BY created_at LIMIT 1',
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', claimed_by = ?, lease_expires = ?, "
+                    'attempts = attempts + 1 WHERE id = ?',
+                    (self.owner, now + self.lease, row['id']),
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        # Only while we still own the job: after a lost lease another worker has it
+        self._connect().execute(f'UPDATE jobs SET {columns} WHERE id = ? AND claimed_by = ?',
+                                (*fields.values(), job_id, self.owner))
+        with self._changed:
+            self._changed.notify_all()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                self._connect().execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE status = 'running' AND claimed_by = ?",
+                    (time.time() + self.lease, self.owner),
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Job lease renewal failed: {e}")
+            try:
+                self._prune()
+            except sqlite3.Error as e:
+                logger.error(f"Job pruning failed: {e}")
+
+    def _prune(self):
+        pruned = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (time.time() - self.retention,),
+        ).rowcount
+        if pruned:
+            logger.info(f"Pruned {pruned} finished job(s).")
+
+    def _run(self):
+        while True:
+            if not self._run_one():
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+
+    def _run_one(self):
+        """Claim and execute one due job; return False if there was none."""
+        try:
+            row = self._claim()
+        except sqlite3.Error as e:
+            logger.error(f"Job claim failed: {e}")
+            return False
+        if row is None:
+            return False
+        try:
+            self._execute(row['id'], row['url'], json.loads(row['stages']), row['attempts'] + 1)
+        except sqlite3.Error as e:
+            logger.error(f"Job {row['id']} state update failed: {e}")
+        return True
+
+    def _execute(self, job_id, url, stages, attempt):
+        def progress(stage):
+            stages[stage] = time.time()
+            self._update(job_id, stage=stage, stages=json.dumps(stages))
+
+        try:
+            result = self.handler(url, progress)
+        except RetryLater as e:
+            if attempt < self.max_attempts:
+                self._update(job_id, status='queued', stage='queued', run_after=time.time() + e.delay)
+                return
+            stages['failed'] = time.time()
+            self._update(job_id, status='failed', stage='failed', stages=json.dumps(stages),
+                         error=f"Still busy after {attempt} attempts, please try again later")
+        except JobError as e:
+            stages['failed'] = time.time()
+            self._update(job_id, status='failed', stage='failed', stages=json.dumps(stages), error=str(e))
+        except Exception as e:
+            logger.exception(f"Job {job_id} crashed")
+            stages['failed'] = time.time()
+            self._update(job_id, status='failed', stage='failed', stages=json.dumps(stages),
+                         error='Internal error while processing the paper')
+        else:
+            stages['done'] = time.time()
+            self._update(job_id, status='done', stage='done', stages=json.dumps(stages),
+                         result=json.dumps(result))
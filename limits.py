@@ -0,0 +1,181 @@
+import os
+import time
+import asyncio
+import threading
+
+# --- Configuration ---
+# Longest a request may queue for an upstream slot before being turned away with a 429
+ADMISSION_TIMEOUT = float(os.environ.get('ADMISSION_TIMEOUT', 5))
+# Longest a request waits on someone else's identical in-flight crawl or analysis
+FLIGHT_WAIT_TIMEOUT = float(os.environ.get('FLIGHT_WAIT_TIMEOUT', 90))
+
+class RateLimited(Exception):
+    def __init__(self, upstream, retry_after):
+        super().__init__(f"{upstream} rate limit exceeded, retry after {retry_after:.1f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+class WaitTimeout(RateLimited):
+    """A waiter gave up on a shared call that is still running. Handled like RateLimited:
+    the caller is told to retry, by which time the leader has usually cached its result."""
+
+    def __init__(self, key, timeout):
+        Exception.__init__(self, f"Gave up after {timeout:.0f}s waiting for in-flight {key}")
+        self.upstream = key
+        self.retry_after = ADMISSION_TIMEOUT
+
+# --- Token Bucket ---
+class TokenBucket:
+    """Token bucket where callers reserve future tokens, up to max_queue of them.
+
+    A reservation that would have to wait longer than the admission timeout, or that
+    would overflow the queue, is rejected immediately with RateLimited.
+    """
+
+    def __init__(self, name, rate, burst, max_queue):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout=ADMISSION_TIMEOUT):
+        """Reserve a token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Negative tokens are reservations held by callers already waiting
+            wait = (1 - self._tokens) / self.rate
+            if self._tokens - 1 < -self.max_queue or wait > timeout:
+                raise RateLimited(self.name, max(wait, 0))
+            self._tokens -= 1
+        return max(wait, 0)
+
+    def acquire(self, timeout=ADMISSION_TIMEOUT):
+        wait = self.reserve(timeout)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout=ADMISSION_TIMEOUT):
+        wait = self.reserve(timeout)
+        if wait:
+            await asyncio.sleep(wait)
+
+# --- Single-flight Deduplication ---
+class Abandoned(Exception):
+    """The leader gave up without a result (e.g. its client disconnected mid-stream).
+    Waiters should claim the key again rather than treat this as a failure."""
+
+class _Call:
+    def __init__(self, key):
+        self.key = key
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=FLIGHT_WAIT_TIMEOUT):
+        if not self.done.wait(timeout):
+            raise WaitTimeout(self.key, timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution of fn."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key):
+        """Return (call, leader). The leader must resolve() the call, even on failure;
+        everyone else waits on call.wait()."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call(key)
+            return call, True
+
+    def resolve(self, key, call, result=None, error=None):
+        call.result, call.error = result, error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def do(self, key, fn, *args):
+        while True:
+            call, leader = self.claim(key)
+            if leader:
+                break
+            try:
+                return call.wait()
+            except Abandoned:
+                continue
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self.resolve(key, call, error=e)
+            raise
+        self.resolve(key, call, result)
+        return result
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop."""
+
+    def __init__(self):
+        self._calls = {}
+
+    def claim(self, key):
+        """Return (future, leader); same contract as SingleFlight.claim, waiters await the future."""
+        future = self._calls.get(key)
+        if future is not None:
+            return future, False
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting when the leader fails; don't warn about an unretrieved error
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return future, True
+
+    def resolve(self, key, future, result=None, error=None):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def do(self, key, fn, *args):
+        while True:
+            task = self._calls.get(key)
+            if task is None:
+                task = self._calls[key] = asyncio.ensure_future(fn(*args))
+                task.add_done_callback(lambda done: self._forget(key, done))
+            try:
+                return await self.wait(key, task)
+            except Abandoned:
+                continue
+
+    async def wait(self, key, future, timeout=FLIGHT_WAIT_TIMEOUT):
+        """Await a claimed future or do() task without cancelling it for everyone else."""
+        try:
+            # shield: one caller timing out or disconnecting must not cancel the shared call
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise WaitTimeout(key, timeout) from None
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+arxiv_limiter = TokenBucket('arXiv', rate=float(os.environ.get('ARXIV_RATE', 4)),
+                            burst=int(os.environ.get('ARXIV_BURST', 8)),
+                            max_queue=int(os.environ.get('ARXIV_MAX_QUEUE', 16)))
+gemini_limiter = TokenBucket('Gemini', rate=float(os.environ.get('GEMINI_RATE', 2)),
+                             burst=int(os.environ.get('GEMINI_BURST', 5)),
+                             max_queue=int(os.environ.get('GEMINI_MAX_QUEUE', 20)))
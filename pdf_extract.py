@@ -0,0 +1,228 @@
+import os
+import time
+import asyncio
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, wait
+from concurrent.futures.process import BrokenProcessPool
+import requests
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PDF_MAX_BYTES = int(os.environ.get('PDF_MAX_BYTES', 25 * 1024 * 1024))
+# Download and extraction get separate budgets, so a slow download can't starve the parse
+PDF_TIMEOUT = float(os.environ.get('PDF_TIMEOUT', 30))
+PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', 20))
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 3))
+PDF_CHAR_BUDGET = int(os.environ.get('PDF_CHAR_BUDGET', 10000))
+# 0 parses in the request thread instead, for hosts without /dev/shm (e.g. AWS Lambda)
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', 2))
+CHUNK_SIZE = 64 * 1024
+
+class PdfExtractionError(Exception):
+    pass
+
+# --- Extraction Worker Pool ---
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web server is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+_pool_futures = {}  # pool -> futures submitted to it that have not finished yet
+
+def _terminate(pool):
+    for process in list(getattr(pool, '_processes', {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _reset_pool():
+    """Drop a broken pool; its workers are already dead or dying."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _pool_futures.pop(pool, None)
+    if pool is not None:
+        _terminate(pool)
+
+def _retire_pool(pool, stuck):
+    """Route new work to a fresh pool, and kill this one once everything but stuck has finished.
+
+    A worker stuck inside one page can't be interrupted, but terminating the pool straight
+    away would also kill every other request's extraction with BrokenProcessPool.
+    """
+    global _pool
+    with _pool_lock:
+        if pool not in _pool_futures:
+            return  # already retiring; that reaper will kill it
+        if _pool is pool:
+            _pool = None
+        others = _pool_futures.pop(pool) - {stuck}
+
+    def reap():
+        wait(others, timeout=PDF_EXTRACT_TIMEOUT)
+        _terminate(pool)
+    threading.Thread(target=reap, name='pdf-pool-reaper', daemon=True).start()
+
+def _submit(*args):
+    try:
+        pool = get_pool()
+        future = pool.submit(_extract_pages, *args)
+    except OSError as e:
+        # Typically no shared memory for the pool's semaphores; PDF_WORKERS=0 avoids the pool
+        _reset_pool()
+        raise PdfExtractionError(f"PDF worker pool unavailable: {e}") from e
+    with _pool_lock:
+        _pool_futures.setdefault(pool, set()).add(future)
+    future.add_done_callback(lambda done: _pool_futures.get(pool, set()).discard(done))
+    return pool, future
+
+def _timed_out(pool, future):
+    # Still queued: just drop it. Already running: its worker may be stuck, retire the pool.
+    if not future.cancel():
+        _retire_pool(pool, future)
+
+def warm_up_pool():
+    # Spawning workers takes ~1s; pay it up front instead of on the first PDF
+    if not PDF_WORKERS:
+        from PyPDF2 import PdfReader  # noqa: F401
+        return
+    list(get_pool().map(abs, range(PDF_WORKERS)))
+
+def _extract_pages(path, max_pages, char_budget, deadline):
+    # Runs in a worker process; stops at the page or character budget, whichever comes first.
+    # Any failure is re-raised as PdfExtractionError: PyPDF2 also throws KeyError/ValueError/...
+    # on malformed files, and the web process never imports PyPDF2 to catch its error types.
+    from PyPDF2 import PdfReader
+
+    try:
+        reader = PdfReader(path)
+        text = ""
+        for i in range(min(max_pages, len(reader.pages))):
+            if time.time() > deadline:
+                break
+            text += reader.pages[i].extract_text() or ""
+            if len(text) >= char_budget:
+                break
+    except Exception as e:
+        raise PdfExtractionError(f"Unreadable PDF: {type(e).__name__}: {e}") from None
+    return text[:char_budget]
+
+# --- Streaming Download ---
+class _Spool:
+    """Size- and deadline-capped temp file that a response body is streamed into."""
+
+    def __init__(self, response, deadline, max_bytes=PDF_MAX_BYTES):
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise PdfExtractionError(f"PDF is {length} bytes, limit is {max_bytes}")
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.size = 0
+        try:
+            self.file = tempfile.NamedTemporaryFile(prefix='papershare-', suffix='.pdf', delete=False)
+        except OSError as e:
+            raise PdfExtractionError(f"Cannot spool PDF: {e}") from e
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PdfExtractionError(f"PDF exceeds {self.max_bytes} bytes")
+        if time.time() > self.deadline:
+            raise PdfExtractionError("PDF download exceeded its time limit")
+        try:
+            self.file.write(chunk)
+        except OSError as e:
+            raise PdfExtractionError(f"Cannot spool PDF: {e}") from e
+
+    def close(self):
+        try:
+            self.file.close()
+        except OSError as e:
+            os.unlink(self.file.name)
+            raise PdfExtractionError(f"Cannot spool PDF: {e}") from e
+        return self.file.name
+
+    def discard(self):
+        self.file.close()
+        os.unlink(self.file.name)
+
+def spool_response(response, deadline, max_bytes=PDF_MAX_BYTES):
+    """Stream the response body into a size-capped temp file and return its path."""
+    spool = _Spool(response, deadline, max_bytes)
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            spool.write(chunk)
+    except requests.RequestException as e:
+        spool.discard()
+        raise PdfExtractionError(f"PDF download failed: {e}") from e
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.close()
+
+async def aspool_response(response, deadline, max_bytes=PDF_MAX_BYTES):
+    """Async twin of spool_response for a streamed httpx response."""
+    import httpx
+
+    spool = _Spool(response, deadline, max_bytes)
+    try:
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            spool.write(chunk)
+    except httpx.HTTPError as e:
+        spool.discard()
+        raise PdfExtractionError(f"PDF download failed: {e}") from e
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.close()
+
+def extract_text_from_response(response, max_pages=PDF_MAX_PAGES, char_budget=PDF_CHAR_BUDGET,
+                               timeout=PDF_TIMEOUT, extract_timeout=PDF_EXTRACT_TIMEOUT):
+    """Spool a streamed PDF response to disk and extract its leading text off-thread."""
+    path = spool_response(response, time.time() + timeout)
+    try:
+        if not PDF_WORKERS:
+            # No pool to time out: the per-page deadline bounds the parse
+            return _extract_pages(path, max_pages, char_budget, time.time() + extract_timeout)
+        pool, future = _submit(path, max_pages, char_budget, time.time() + extract_timeout)
+        try:
+            return future.result(timeout=extract_timeout)
+        except FuturesTimeout:
+            _timed_out(pool, future)
+            raise PdfExtractionError(f"PDF extraction exceeded {extract_timeout}s")
+        except BrokenProcessPool as e:
+            _reset_pool()
+            raise PdfExtractionError(f"PDF worker crashed: {e}") from e
+    finally:
+        os.unlink(path)
+
+async def aextract_text_from_response(response, max_pages=PDF_MAX_PAGES, char_budget=PDF_CHAR_BUDGET,
+                                      timeout=PDF_TIMEOUT, extract_timeout=PDF_EXTRACT_TIMEOUT):
+    """Async twin of extract_text_from_response; the event loop awaits the process pool."""
+    path = await aspool_response(response, time.time() + timeout)
+    try:
+        if not PDF_WORKERS:
+            return await asyncio.to_thread(_extract_pages, path, max_pages, char_budget,
+                                           time.time() + extract_timeout)
+        pool, future = _submit(path, max_pages, char_budget, time.time() + extract_timeout)
+        try:
+            # shield: on timeout we decide ourselves whether the task can be cancelled
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), extract_timeout)
+        except asyncio.TimeoutError:
+            _timed_out(pool, future)
+            raise PdfExtractionError(f"PDF extraction exceeded {extract_timeout}s")
+        except BrokenProcessPool as e:
+            _reset_pool()
+            raise PdfExtractionError(f"PDF worker crashed: {e}") from e
+    finally:
+        os.unlink(path)
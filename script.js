@@ -10,6 +10,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const paperForm = document.getElementById('paper-form');
     const paperUrlInput = document.getElementById('paper-url');
     const loadingIndicator = document.getElementById('loading-indicator');
+    const loadingText = document.getElementById('loading-text');
     const errorMessage = document.getElementById('error-message');
     const errorText = document.getElementById('error-text');
     const outputContainer = document.getElementById('output-container');
@@ -108,20 +109,9 @@ document.addEventListener('DOMContentLoaded', () => {
         hideOutput();
 
         try {
-            const response = await fetch('/process', { // Fetch from root path
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ url: url }),
-            });
-
-            const result = await response.json();
-
-            if (!response.ok || !result.success) {
-                throw new Error(result.error || `Server error: ${response.status}`);
-            }
-
-            displayResults(result.data);
-            addToHistory(result.data.paper_title || 'Untitled Paper', url); // Add to history on success
+            const data = await streamProcess(url);
+            displayResults(data);
+            addToHistory(data.paper_title || 'Untitled Paper', url); // Add to history on success
 
         } catch (error) {
             console.error("Submission error:", error);
@@ -131,6 +121,82 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // --- Streaming (Server-Sent Events over fetch) ---
+    // Resolves with the same `data` object /process returns, filling tabs as fields arrive
+    async function streamProcess(url) {
+        const response = await fetch('/process/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+            body: JSON.stringify({ url: url }),
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`Server error: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const partial = {};
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const { event, data } = parseSseEvent(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+
+                if (event === 'stage') {
+                    setLoadingText(stageLabels[data.stage]);
+                } else if (event === 'field') {
+                    partial[data.field] = (partial[data.field] || '') + data.delta;
+                    displayPartial(partial);
+                } else if (event === 'result') {
+                    return data.data;
+                } else if (event === 'error') {
+                    throw new Error(data.error);
+                }
+            }
+        }
+        throw new Error("The connection closed before the analysis finished.");
+    }
+
+    const stageLabels = {
+        crawl: 'Fetching paper from arXiv...',
+        analysis: 'Writing your posts...',
+    };
+
+    function parseSseEvent(block) {
+        let event = 'message';
+        const dataLines = [];
+        block.split('\n').forEach(line => {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        });
+        return { event, data: dataLines.length ? JSON.parse(dataLines.join('\n')) : {} };
+    }
+
+    function displayPartial(partial) {
+        if (contentMap.linkedin && partial.linkedin_post) contentMap.linkedin.textContent = partial.linkedin_post;
+        if (contentMap.twitter && partial.twitter_thread) contentMap.twitter.textContent = partial.twitter_thread;
+        if (contentMap.novice && (partial.key_takeaway || partial.novice_analogy)) {
+            contentMap.novice.textContent = `⭐ THE BIG IDEA:\n${partial.key_takeaway || ''}` +
+                (partial.novice_analogy ? `\n\n🏠 ANALOGY:\n${partial.novice_analogy}` : '');
+        }
+
+        // Reveal the output on the first streamed content, without resetting the user's tab
+        if (outputContainer && !outputContainer.classList.contains('active')) {
+            outputContainer.style.display = 'block';
+            outputContainer.classList.add('active');
+            if (tabButtons.length > 0 && tabContents.length > 0) {
+                activateTab(tabButtons[0], tabContents[0]);
+            }
+        }
+    }
+
     // --- UI Update Functions ---
     function setLoadingState(isLoading) {
          const submitButton = paperForm ? paperForm.querySelector('button[type="submit"]') : null;
@@ -143,9 +209,14 @@ document.addEventListener('DOMContentLoaded', () => {
             if(loadingIndicator) loadingIndicator.classList.remove('active');
             if(paperUrlInput) paperUrlInput.disabled = false;
             if(submitButton) submitButton.disabled = false;
+            setLoadingText('Processing paper... Please wait');
         }
     }
 
+    function setLoadingText(message) {
+        if (loadingText && message) loadingText.textContent = message;
+    }
+
     function showError(message) {
         if (errorText) errorText.textContent = message;
         if (errorMessage) errorMessage.style.display = 'flex';
@@ -0,0 +1,46 @@
+import re
+import json
+
+# Start of a top-level string value: "key": "
+FIELD_START_RE = re.compile(r'"(\w+)"\s*:\s*"')
+
+# --- Server-Sent Events ---
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# --- Partial JSON Parsing ---
+def partial_json_fields(buffer):
+    """Return the string fields of a JSON object that is still being generated.
+
+    The last field may be cut off mid-value; its text so far is returned. Escape
+    sequences split across chunks are held back until they are complete.
+    """
+    fields = {}
+    pos = 0
+    while True:
+        match = FIELD_START_RE.search(buffer, pos)
+        if not match:
+            return fields
+        start = i = match.end()
+        complete = i
+        while i < len(buffer) and buffer[i] != '"':
+            step = 1
+            if buffer[i] == '\\':
+                step = 6 if buffer[i + 1:i + 2] == 'u' else 2
+                # A high surrogate (\ud83d) is only complete with the low one that follows it
+                if step == 6 and buffer[i + 2:i + 4].lower() in ('d8', 'd9', 'da', 'db') \
+                        and buffer[i + 6:i + 8] in ('\\u', '\\', ''):
+                    step = 12
+            i += step
+            if i <= len(buffer):
+                complete = i
+        fields[match.group(1)] = _decode(buffer[start:complete])
+        if i >= len(buffer):
+            return fields
+        pos = i + 1
+
+def _decode(raw):
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
@@ -0,0 +1,80 @@
+import pytest
+import cache
+from cache import ResultCache, canonical_abs_url, canonical_pdf_url, parse_arxiv_url
+
+# --- arXiv IDs ---
+@pytest.mark.parametrize('url, expected', [
+    ('https://arxiv.org/abs/2403.10235', ('2403.10235', '')),
+    ('https://arxiv.org/pdf/2403.10235v2.pdf', ('2403.10235', 'v2')),
+    ('http://www.arxiv.org/abs/1501.00001V3', ('1501.00001', 'v3')),
+    ('https://arxiv.org/abs/0704.0001', ('0704.0001', '')),
+    ('https://arxiv.org/abs/hep-th/9901001', ('hep-th/9901001', '')),
+    ('arxiv.org/pdf/math.GT/0309136v1', ('math.GT/0309136', 'v1')),
+    ('https://arxiv.org/abs/cond-mat/0102536v2', ('cond-mat/0102536', 'v2')),
+])
+def test_parse_arxiv_url(url, expected):
+    assert parse_arxiv_url(url) == expected
+
+@pytest.mark.parametrize('url', [None, '', 'https://example.com/abs/2403.10235', 'https://arxiv.org/list/cs.CL'])
+def test_parse_arxiv_url_rejects_non_arxiv(url):
+    assert parse_arxiv_url(url) is None
+
+def test_canonical_urls_point_at_the_configured_host():
+    assert canonical_abs_url('2403.10235', 'v2') == f"{cache.ARXIV_BASE_URL}/abs/2403.10235v2"
+    assert canonical_pdf_url('hep-th/9901001') == f"{cache.ARXIV_BASE_URL}/pdf/hep-th/9901001"
+
+# --- Result Cache ---
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    return now
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+def test_values_round_trip_through_sqlite(db_path, clock):
+    ResultCache(path=db_path).set('k', {'title': 'Paper', 'authors': ['A', 'B']})
+    # A fresh instance has an empty hot tier, so this reads SQLite
+    assert ResultCache(path=db_path).get('k') == {'title': 'Paper', 'authors': ['A', 'B']}
+    assert ResultCache(path=db_path).get('missing') is None
+
+def test_entries_expire_after_ttl(db_path, clock):
+    writer = ResultCache(path=db_path, ttl=60)
+    writer.set('k', 'v')
+    clock[0] += 59
+    assert ResultCache(path=db_path, ttl=60).get('k') == 'v'
+    clock[0] += 2
+    assert writer.get('k') is None
+    assert ResultCache(path=db_path, ttl=60).get('k') is None
+
+def test_promoted_entries_keep_their_original_expiry(db_path, clock):
+    ResultCache(path=db_path, ttl=60).set('k', 'v')
+    clock[0] += 50
+    reader = ResultCache(path=db_path, ttl=60)
+    assert reader.get('k') == 'v'  # now in reader's hot tier
+    clock[0] += 20
+    assert reader.get('k') is None
+
+def test_least_recently_read_entry_is_evicted(db_path, clock):
+    writer = ResultCache(path=db_path, max_entries=2)
+    writer.set('a', 1)
+    clock[0] += 1
+    writer.set('b', 2)
+    clock[0] += 1
+    ResultCache(path=db_path).get('a')  # SQLite hit: refreshes accessed_at
+    clock[0] += 1
+    writer.set('c', 3)
+
+    reader = ResultCache(path=db_path)
+    assert reader.get('a') == 1 and reader.get('c') == 3
+    assert reader.get('b') is None
+
+def test_tables_are_independent(db_path, clock):
+    results = ResultCache(path=db_path)
+    validators = ResultCache(path=db_path, table='http_validators')
+    results.set('k', 'result')
+    validators.set('k', {'etag': '"abc"'})
+    assert ResultCache(path=db_path).get('k') == 'result'
+    assert ResultCache(path=db_path, table='http_validators').get('k') == {'etag': '"abc"'}
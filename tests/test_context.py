@@ -0,0 +1,93 @@
+import pytest
+from context import estimate_tokens, segment, select_context
+
+PAPER = """Sparse Attention for Long Documents
+Jane Doe, Department of Computer Science, Example University
+jane@example.edu
+arXiv:2403.10235v1 [cs.CL] 15 Mar 2024
+Abstract
+We study sparse attention patterns that let transformers read long scientific documents.
+1 Introduction
+Transformers struggle with long inputs because attention cost grows quadratically with length.
+We propose a block-sparse pattern that keeps only local windows and a few global tokens.
+Code is available at https://github.com/example/sparse.
+2
+2 Method
+Each query attends to a local window of 256 tokens and to 16 global summary tokens.
+8 heads and a model dimension of 512 are used in every layer of the encoder.
+The global tokens are learned end to end together with the rest of the model.
+3 Experiments
+On long-document summarization the sparse model matches dense attention at a fraction of the cost.
+References
+[1] A. Vaswani et al. Attention is all you need. NeurIPS 2017.
+[2] I. Beltagy et al. Longformer: the long-document transformer. arXiv 2020.
+"""
+
+ABSTRACT = "We study sparse attention patterns that let transformers read long scientific documents."
+
+def sections(text):
+    return {title: sentences for title, sentences in segment(text)}
+
+def test_numbered_headings_open_sections_but_body_lines_do_not():
+    found = sections(PAPER)
+    assert list(found) == ['1 Introduction', '2 Method', '3 Experiments']
+    # "8 heads and a model dimension of 512 ..." is a body line, not a heading
+    assert any(s.startswith('8 heads') for s in found['2 Method'])
+
+def test_preamble_abstract_and_references_are_dropped():
+    text = ' '.join(s for _, sentences in segment(PAPER) for s in sentences)
+    assert 'Example University' not in text
+    assert 'jane@example.edu' not in text
+    assert 'arXiv:2403.10235' not in text
+    assert 'read long scientific documents' not in text
+    assert 'Vaswani' not in text and 'Longformer' not in text
+
+def test_boilerplate_is_filtered_per_sentence():
+    intro = sections(PAPER)['1 Introduction']
+    # The URL sentence shares its line-joined paragraph with real content, which survives
+    assert not any('github.com' in s for s in intro)
+    assert any(s.startswith('We propose a block-sparse pattern') for s in intro)
+
+def test_long_sentences_mentioning_a_url_are_kept():
+    body = ("We release the full training pipeline, the evaluation harness and every checkpoint "
+            "used in this paper at https://example.org/sparse so that others can reproduce the results.")
+    found = sections(f"1 Introduction\n{body}\n")
+    assert found['1 Introduction'] == [body]
+
+def test_hyphenated_line_breaks_are_rejoined_and_duplicates_dropped():
+    text = ("1 Introduction\nAttention cost grows quadratically with the sequence length of the in-\n"
+            "put document.\nAttention cost grows quadratically with the sequence length of the input document.\n")
+    assert sections(text)['1 Introduction'] == [
+        'Attention cost grows quadratically with the sequence length of the input document.'
+    ]
+
+def test_text_without_headings_keeps_its_preamble():
+    text = "Transformers struggle with long inputs because attention cost grows quadratically.\n"
+    assert segment(text) == [('Preamble', [text.strip()])]
+
+def test_select_context_respects_the_token_budget_and_document_order():
+    context, stats = select_context(PAPER, ABSTRACT, token_budget=60)
+    assert stats['context_tokens'] <= 60
+    assert stats['tokens_saved'] == stats['legacy_tokens'] - stats['context_tokens']
+    assert context
+    lines = [line for line in context.splitlines() if line and not line.startswith('[')]
+    positions = [PAPER.index(line) for line in lines]
+    assert positions == sorted(positions)
+
+def test_select_context_groups_sentences_under_their_headings():
+    context, _ = select_context(PAPER, ABSTRACT, token_budget=1000)
+    assert '[1 Introduction]' in context and '[2 Method]' in context
+    assert context.index('[1 Introduction]') < context.index('[2 Method]') < context.index('[3 Experiments]')
+
+@pytest.mark.parametrize('budget', [0, 5])
+def test_select_context_with_too_small_a_budget_selects_nothing(budget):
+    context, stats = select_context(PAPER, ABSTRACT, token_budget=budget)
+    assert context == '' and stats['context_tokens'] == 0
+
+def test_select_context_without_an_abstract_falls_back_to_a_prefix():
+    context, _ = select_context(PAPER, '   ', token_budget=10)
+    assert context == PAPER[:10 * 4]
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('abcde') == 2
@@ -0,0 +1,103 @@
+import time
+import pytest
+from jobs import JobError, JobQueue, RetryLater
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+def make_queue(db_path, handler, **options):
+    # Workers aren't started: tests drive the queue one job at a time with _run_one()
+    return JobQueue(handler, path=db_path, workers=0, **options)
+
+def test_job_records_stages_and_result(db_path):
+    def handler(url, progress):
+        progress('crawl')
+        progress('analysis')
+        return {'url': url}
+
+    queue = make_queue(db_path, handler)
+    job_id = queue.submit('https://arxiv.org/abs/2403.10235')
+    assert queue._run_one()
+    job = queue.get(job_id)
+    assert job['status'] == 'done' and job['result'] == {'url': 'https://arxiv.org/abs/2403.10235'}
+    assert list(job['stages']) == ['queued', 'crawl', 'analysis', 'done']
+    assert not queue._run_one()
+
+def test_job_error_fails_the_job(db_path):
+    def handler(url, progress):
+        raise JobError('Could not fetch paper details')
+
+    queue = make_queue(db_path, handler)
+    job_id = queue.submit('u')
+    queue._run_one()
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and job['error'] == 'Could not fetch paper details'
+
+def test_retry_later_requeues_until_max_attempts(db_path):
+    calls = []
+    def handler(url, progress):
+        calls.append(url)
+        raise RetryLater(0)
+
+    queue = make_queue(db_path, handler, max_attempts=3)
+    job_id = queue.submit('u')
+    for _ in range(2):
+        queue._run_one()
+        assert queue.get(job_id)['status'] == 'queued'
+    queue._run_one()
+    job = queue.get(job_id)
+    assert job['status'] == 'failed' and 'after 3 attempts' in job['error']
+    assert len(calls) == 3
+    assert not queue._run_one()
+
+def test_retry_later_respects_delay(db_path):
+    def handler(url, progress):
+        raise RetryLater(60)
+
+    queue = make_queue(db_path, handler)
+    queue.submit('u')
+    assert queue._run_one()
+    assert not queue._run_one()
+
+def test_expired_lease_is_reclaimed_and_stale_owner_ignored(db_path):
+    dead = make_queue(db_path, None, lease=0.01)
+    job_id = dead.submit('u')
+    assert dead._claim()['id'] == job_id
+    time.sleep(0.05)
+
+    survivor = make_queue(db_path, lambda url, progress: 'ok')
+    assert survivor._run_one()
+    # The original owner wakes up after losing its lease; its writes must not land
+    dead._update(job_id, status='failed', stage='failed', error='stale')
+    job = survivor.get(job_id)
+    assert job['status'] == 'done' and job['result'] == 'ok' and 'error' not in job
+
+def test_live_lease_is_not_reclaimed(db_path):
+    owner = make_queue(db_path, None, lease=60)
+    owner.submit('u')
+    owner._claim()
+    assert make_queue(db_path, lambda url, progress: 'ok')._claim() is None
+
+def test_job_that_keeps_losing_its_lease_fails(db_path):
+    crashing = make_queue(db_path, None, lease=0.01, max_attempts=2)
+    job_id = crashing.submit('u')
+    for _ in range(2):
+        assert crashing._claim()['id'] == job_id
+        time.sleep(0.05)
+    assert crashing._claim() is None
+    job = crashing.get(job_id)
+    assert job['status'] == 'failed' and 'failed' in job['stages']
+
+def test_prune_deletes_only_old_finished_jobs(db_path):
+    queue = make_queue(db_path, lambda url, progress: 'ok', retention=3600)
+    finished = queue.submit('done')
+    queue._run_one()
+    pending = queue.submit('pending')
+    queue._prune()
+    assert queue.get(finished) is not None
+
+    queue._connect().execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (time.time() - 7200, finished))
+    queue._prune()
+    assert queue.get(finished) is None
+    assert queue.get(pending)['status'] == 'queued'
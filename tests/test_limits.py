@@ -0,0 +1,169 @@
+import time
+import asyncio
+import threading
+import pytest
+import limits
+from limits import Abandoned, AsyncSingleFlight, RateLimited, SingleFlight, TokenBucket, WaitTimeout
+
+# --- Token Bucket ---
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(limits.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_burst_is_free_then_reservations_queue(clock):
+    bucket = TokenBucket('test', rate=2, burst=2, max_queue=3)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # Each further caller waits one more token interval
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(1.5)
+
+def test_full_queue_is_rejected(clock):
+    bucket = TokenBucket('test', rate=1, burst=1, max_queue=1)
+    bucket.reserve()
+    bucket.reserve(timeout=10)
+    with pytest.raises(RateLimited) as excinfo:
+        bucket.reserve(timeout=10)
+    assert excinfo.value.upstream == 'test'
+    assert excinfo.value.retry_after == pytest.approx(2.0)
+
+def test_rejection_past_timeout_does_not_consume(clock):
+    bucket = TokenBucket('test', rate=1, burst=1, max_queue=10)
+    bucket.reserve()
+    with pytest.raises(RateLimited) as excinfo:
+        bucket.reserve(timeout=0.5)
+    assert excinfo.value.retry_after == pytest.approx(1.0)
+    # The rejected caller held no reservation, so the next one waits just as long
+    assert bucket.reserve(timeout=5) == pytest.approx(1.0)
+
+def test_tokens_refill_up_to_burst(clock):
+    bucket = TokenBucket('test', rate=2, burst=2, max_queue=0)
+    bucket.reserve()
+    bucket.reserve()
+    clock[0] += 60
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    with pytest.raises(RateLimited):
+        bucket.reserve()
+
+# --- Single-flight ---
+def run_concurrently(flight, key, fn, callers):
+    """Start callers threads on flight.do(key, fn) once the first has claimed the key."""
+    results = [None] * callers
+    def call(index):
+        try:
+            results[index] = flight.do(key, fn)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    while key not in flight._calls:
+        pass
+    for thread in threads[1:]:
+        thread.start()
+    return threads, results
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flight, calls, release = SingleFlight(), [], threading.Event()
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return 'paper'
+
+    threads, results = run_concurrently(flight, 'k', fn, 5)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == ['paper'] * 5
+
+def test_single_flight_error_reaches_every_waiter_and_frees_key():
+    flight, release = SingleFlight(), threading.Event()
+    error = ValueError('upstream down')
+    def fn():
+        release.wait(5)
+        raise error
+
+    threads, results = run_concurrently(flight, 'k', fn, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [error] * 4
+    assert flight.do('k', lambda: 'retried') == 'retried'
+
+def test_single_flight_claim_and_resolve():
+    flight = SingleFlight()
+    call, leader = flight.claim('k')
+    other, follower_leads = flight.claim('k')
+    assert leader and not follower_leads and other is call
+    flight.resolve('k', call, error=RateLimited('Gemini', 3))
+    with pytest.raises(RateLimited):
+        other.wait()
+    assert flight.claim('k')[1]
+
+def test_single_flight_waiter_takes_over_an_abandoned_key():
+    flight, calls = SingleFlight(), []
+    call, _ = flight.claim('k')
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(flight.do('k', lambda: calls.append(1) or 'fresh')))
+    waiter.start()
+    time.sleep(0.05)
+    flight.resolve('k', call, error=Abandoned('k'))
+    waiter.join(5)
+    assert results == ['fresh'] and calls == [1]
+
+def test_async_single_flight_waiter_takes_over_an_abandoned_key():
+    async def main():
+        flight = AsyncSingleFlight()
+        future, _ = flight.claim('k')
+        async def fn():
+            return 'fresh'
+        waiter = asyncio.ensure_future(flight.do('k', fn))
+        await asyncio.sleep(0)
+        flight.resolve('k', future, error=Abandoned('k'))
+        return await waiter
+
+    assert asyncio.run(main()) == 'fresh'
+
+def test_single_flight_wait_is_bounded_and_leaves_the_key_claimed():
+    flight = SingleFlight()
+    call, _ = flight.claim('k')
+    with pytest.raises(RateLimited) as raised:
+        flight.claim('k')[0].wait(timeout=0.01)
+    assert isinstance(raised.value, WaitTimeout)
+    flight.resolve('k', call, 'late')
+    assert call.wait() == 'late'
+
+def test_async_single_flight_wait_timeout_does_not_cancel_the_call():
+    async def main():
+        flight = AsyncSingleFlight()
+        future, _ = flight.claim('k')
+        with pytest.raises(WaitTimeout):
+            await flight.wait('k', future, timeout=0.01)
+        flight.resolve('k', future, 'late')
+        return await flight.wait('k', future)
+
+    assert asyncio.run(main()) == 'late'
+
+def test_async_single_flight_shares_result_and_error():
+    async def main():
+        flight, calls = AsyncSingleFlight(), []
+        async def fn(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            if value == 'bad':
+                raise ValueError(value)
+            return value
+
+        results = await asyncio.gather(*(flight.do('k', fn, 'good') for _ in range(3)))
+        errors = await asyncio.gather(*(flight.do('e', fn, 'bad') for _ in range(3)), return_exceptions=True)
+        return calls, results, errors
+
+    calls, results, errors = asyncio.run(main())
+    assert calls == ['good', 'bad']
+    assert results == ['good'] * 3
+    assert all(isinstance(e, ValueError) for e in errors)
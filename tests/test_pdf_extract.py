@@ -0,0 +1,94 @@
+import os
+import time
+import asyncio
+import tempfile
+import pytest
+import requests
+import pdf_extract
+from pdf_extract import PdfExtractionError, extract_text_from_response, spool_response
+
+class FakeResponse:
+    """Just enough of a streamed requests/httpx response for the spooler."""
+
+    def __init__(self, body, headers=None, chunk_delay=0.0, error=None):
+        self.body = body
+        self.headers = headers or {}
+        self.chunk_delay = chunk_delay
+        self.error = error
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            time.sleep(self.chunk_delay)
+            yield self.body[start:start + size]
+        if self.error:
+            raise self.error
+
+    async def aiter_bytes(self, size):
+        for chunk in self.iter_content(size):
+            yield chunk
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
+
+def test_spool_writes_the_whole_body(spool_dir):
+    path = spool_response(FakeResponse(b'x' * 200_000), time.time() + 10)
+    with open(path, 'rb') as f:
+        assert f.read() == b'x' * 200_000
+    os.unlink(path)
+
+def test_spool_rejects_oversized_content_length_before_reading(spool_dir):
+    with pytest.raises(PdfExtractionError, match='limit is 100'):
+        spool_response(FakeResponse(b'', headers={'Content-Length': '101'}), time.time() + 10, max_bytes=100)
+    assert list(spool_dir.iterdir()) == []
+
+def test_spool_stops_once_the_body_exceeds_max_bytes(spool_dir):
+    with pytest.raises(PdfExtractionError, match='exceeds'):
+        spool_response(FakeResponse(b'x' * 200_000), time.time() + 10, max_bytes=100_000)
+    assert list(spool_dir.iterdir()) == []
+
+def test_spool_stops_at_the_deadline(spool_dir):
+    slow = FakeResponse(b'x' * 10 * pdf_extract.CHUNK_SIZE, chunk_delay=0.02)
+    with pytest.raises(PdfExtractionError, match='time limit'):
+        spool_response(slow, time.time() + 0.05)
+    assert list(spool_dir.iterdir()) == []
+
+def test_spool_wraps_download_errors(spool_dir):
+    broken = FakeResponse(b'x' * 10, error=requests.ConnectionError('reset'))
+    with pytest.raises(PdfExtractionError, match='download failed'):
+        spool_response(broken, time.time() + 10)
+    assert list(spool_dir.iterdir()) == []
+
+def test_async_spool_applies_the_same_limits(spool_dir):
+    with pytest.raises(PdfExtractionError, match='exceeds'):
+        asyncio.run(pdf_extract.aspool_response(FakeResponse(b'x' * 200_000), time.time() + 10, max_bytes=100_000))
+    assert list(spool_dir.iterdir()) == []
+
+def test_unwritable_temp_dir_is_an_extraction_error(spool_dir, monkeypatch):
+    def no_space(**kwargs):
+        raise OSError(28, 'No space left on device')
+    monkeypatch.setattr(tempfile, 'NamedTemporaryFile', no_space)
+    with pytest.raises(PdfExtractionError, match='No space left'):
+        spool_response(FakeResponse(b'x'), time.time() + 10)
+
+def test_unavailable_worker_pool_is_an_extraction_error(spool_dir, monkeypatch):
+    def no_shm():
+        raise OSError(38, 'Function not implemented')
+    monkeypatch.setattr(pdf_extract, 'get_pool', no_shm)
+    with pytest.raises(PdfExtractionError, match='pool unavailable'):
+        extract_text_from_response(FakeResponse(b'%PDF-1.4'))
+    assert list(spool_dir.iterdir()) == []
+
+def test_in_process_extraction_reports_unreadable_pdfs(spool_dir, monkeypatch):
+    monkeypatch.setattr(pdf_extract, 'PDF_WORKERS', 0)
+    with pytest.raises(PdfExtractionError, match='Unreadable PDF'):
+        extract_text_from_response(FakeResponse(b'not a pdf at all'))
+    assert list(spool_dir.iterdir()) == []
+
+def test_in_process_extraction_stops_at_the_char_budget(spool_dir, monkeypatch):
+    corpus = pytest.importorskip('bench.corpus')
+    monkeypatch.setattr(pdf_extract, 'PDF_WORKERS', 0)
+    body = corpus.render_pdf(corpus.get_paper('2403.10235'))
+    text = extract_text_from_response(FakeResponse(body), max_pages=3, char_budget=500)
+    assert len(text) == 500
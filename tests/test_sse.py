@@ -0,0 +1,27 @@
+import json
+import pytest
+from sse import partial_json_fields, sse_event
+
+def test_sse_event_frames_json_data():
+    assert sse_event('stage', {'stage': 'crawl'}) == 'event: stage\ndata: {"stage": "crawl"}\n\n'
+
+def test_partial_json_fields_returns_complete_and_partial_values():
+    assert partial_json_fields('{"headline": "Big news", "linkedin_post": "We pro') == {
+        'headline': 'Big news', 'linkedin_post': 'We pro',
+    }
+
+@pytest.mark.parametrize('document', [
+    '{"text": "line one\\nline \\"two\\" \\u00e9t\\u00e9 \\ud83d\\ude80 done"}',
+    '{"a": "back\\\\slash", "b": "tab\\there"}',
+])
+def test_partial_json_fields_grows_monotonically_across_any_split(document):
+    expected = json.loads(document)
+    previous = {}
+    for cut in range(len(document) + 1):
+        fields = partial_json_fields(document[:cut])
+        for key, value in fields.items():
+            # Escapes cut off mid-sequence are held back, never emitted raw
+            assert expected[key].startswith(value), (cut, key, value)
+            assert value.startswith(previous.get(key, '')), (cut, key, value)
+        previous = fields
+    assert previous == expected